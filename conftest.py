@@ -24,3 +24,26 @@ import pytest
 def pytest_addoption(parser):
     parser.addoption("--runslow", action="store_true",
                      help="run slow tests")
+    parser.addoption("--runbenchmark", action="store_true",
+                     help="run benchmarks")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers",
+                            "slow: slow test, "
+                            "needs --runslow option to run")
+    config.addinivalue_line("markers",
+                            "benchmark: performance benchmark, "
+                            "needs --runbenchmark option to run")
+
+
+def pytest_collection_modifyitems(config, items):
+    skip_slow = pytest.mark.skip(reason="need --runslow option to run")
+    skip_benchmark = pytest.mark.skip(
+        reason="need --runbenchmark option to run")
+    for item in items:
+        if "slow" in item.keywords and not config.getoption("--runslow"):
+            item.add_marker(skip_slow)
+        if ("benchmark" in item.keywords and
+                not config.getoption("--runbenchmark")):
+            item.add_marker(skip_benchmark)
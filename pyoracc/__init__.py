@@ -1,13 +1,15 @@
 import sys
 
+__version__ = '0.2.4'
+
 
 def _generate_parsetab():
     """
-    Simple function to generate a parsetab file. This is done by creating a
-    parser which automatically generates the parsetab file too.
+    Generate the lexer and parser tables of every ATF dialect, which are
+    loaded at runtime instead of analysing the rules in each new process.
     """
-    from pyoracc.atf.common.atfyacc import AtfParser
-    myparser = AtfParser()
+    from pyoracc.atf.common.plytables import write_tables
+    write_tables()
 
 
 def _pyversion():
@@ -1,5 +1,6 @@
 from pyoracc.atf.common.atflex import AtfLexer
 class AtfCDLILexer(AtfLexer):
+    lextab = 'pyoracc.atf.cdli.lextab'
 
     def __init__(self, skip, debug, log):
         super(AtfCDLILexer, self).__init__(skip, debug, log)
@@ -1,22 +1,21 @@
 from pyoracc.model.milestone import Milestone
 from pyoracc import _pyversion
 from pyoracc.model.oraccobject import OraccObject
-from pyoracc.model.oraccnamedobject import OraccNamedObject
 from pyoracc.atf.common.atfyacc import AtfParser
 from pyoracc.model.state import State
 from pyoracc.model.text import Text
 
 from pyoracc.model.link_reference import LinkReference
 
-from pyoracc.cdlimodel.structure import Structure
+from pyoracc.cdlimodel.cdliwarning import CDLIWarning
+from pyoracc.cdlimodel.structure import check_document
 
 from pyoracc.cdlimodel.cdlitext import CDLIText
 
-objStructure = Structure()
-
 
 class AtfCDLIParser(AtfParser):
-    
+
+    tabmodule = 'pyoracc.atf.cdli.parsetab'
     tokens = AtfParser.tokens
     precedence = AtfParser.precedence
 
@@ -28,11 +27,7 @@ class AtfCDLIParser(AtfParser):
                     | object
                     | composite"""
         p[0] = p[1]
-
-        objStructure.CheckSurfaceRules()
-        objStructure.PrintResults()
-        objStructure.ClearData()
-        objStructure.ResetColumnCounter()
+        self.warnings.extend(check_document(p[0]))
 
     def p_linkreference_label(self, p):
         """link_reference : link_reference ID
@@ -74,38 +69,12 @@ class AtfCDLIParser(AtfParser):
         objText = CDLIText()
         value, status, errorValue = objText.CheckPMap(p[0].code)
         if errorValue:
-            print(errorValue)
+            self.warnings.append(CDLIWarning('pnumber-replaced', p[0].code,
+                                             'Pnumber', errorValue))
 
         if not objText.CheckPnumber(p[0].code):
-            print("Incorrect Pnumber: " + str(p[0].code))
-
-        global objStructure
-        objStructure.UpdatePnumber(p[0].code)
-
-        if objStructure.newtext_status:
-            objStructure.newtext_status = False
-        else:
-            objStructure.CheckSurfaceRules()
-            objStructure.PrintResults()
-            objStructure.ClearData()
-            objStructure.ResetColumnCounter()
-
-    def p_object_nolabel(self, p):
-        '''object_specifier : TABLET
-                            | ENVELOPE
-                            | PRISM
-                            | BULLA
-                            | SEALINGS'''
-        p[0] = OraccObject(p[1])
-        objStructure.SetObjectType(str(p[0]))
-        # print "Test: %s" % p[0]
-
-    def p_object_label(self, p):
-        '''object_specifier : FRAGMENT ID
-                            | OBJECT ID
-                            | TABLET REFERENCE'''
-        p[0] = OraccNamedObject(p[1], p[2])
-        objStructure.SetObjectType(str(p[2]))
+            self.warnings.append(CDLIWarning('pnumber-invalid', p[0].code,
+                                             'Pnumber', 'Incorrect Pnumber.'))
 
     def p_surface_nolabel(self, p):
         '''surface_specifier  : OBVERSE
@@ -116,21 +85,6 @@ class AtfCDLIParser(AtfParser):
                               | BOTTOM
                               | EDGE'''
         p[0] = OraccObject(p[1])
-        objStructure.SetSurface(str(p[0]))
-        # print "%s" %p[0]
-
-    def p_surface_label(self, p):
-        '''surface_specifier : FACE ID
-                             | SURFACE ID
-                             | COLUMN ID
-                             | SEAL ID
-                             | HEADING ID'''
-        p[0] = OraccNamedObject(p[1], p[2])
-        if str(p[2]) == "column":
-            objStructure.IncrementColumnCounter()
-        else:
-            objStructure.SetSurface(str(p[0]))
-        # print "%s" %p[0]
 
     def p_milestone_brief(self, p):
         """milestone_name : CATCHLINE
@@ -18,67 +18,174 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 import codecs
+import hashlib
 import sys
 import logging
+import threading
 
 from pyoracc.atf.cdli.atflex import AtfCDLILexer
 from pyoracc.atf.cdli.atfyacc import AtfCDLIParser
 from pyoracc.atf.common.atflex import AtfLexer
+from pyoracc.atf.common.atflinelex import ENGINES, AtfLineLexer
 from pyoracc.atf.common.atfyacc import AtfParser
+from pyoracc.atf.common.plytables import lexer_signature, parser_signature
 from pyoracc.atf.oracc.atflex import AtfOraccLexer
 from pyoracc.atf.oracc.atfyacc import AtfOraccParser
-from mako.template import Template
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    filename="parselog.txt",
-    filemode="w",
-    format="%(filename)10s:%(lineno)4d:%(message)s"
-)
-
-log = logging.getLogger()
-
-consoleHandler = logging.StreamHandler()
-log.addHandler(consoleHandler)
+from pyoracc.model.serializer import serialize, write_to
+from ply.yacc import NullLogger
+
+# Held while the debug logger is set up, so that threads parsing with debug
+# at the same time do not each add handlers to it
+_debug_logger_lock = threading.Lock()
+
+
+def debug_logger(filename="parselog.txt"):
+    """
+    Return the logger used for debug output when none is given, logging
+    to filename and the console. It is only set up on first use, so that
+    importing pyoracc or parsing without debug writes no log.
+    """
+    log = logging.getLogger("pyoracc.parselog")
+    with _debug_logger_lock:
+        if log.handlers:
+            return log
+        log.setLevel(logging.DEBUG)
+        fileHandler = logging.FileHandler(filename, mode="w")
+        fileHandler.setFormatter(
+            logging.Formatter("%(filename)10s:%(lineno)4d:%(message)s"))
+        log.addHandler(fileHandler)
+        log.addHandler(logging.StreamHandler())
+        log.propagate = False
+    return log
+
+
+# Lexer and parser classes for each ATF flavour
+ATF_CLASSES = {
+    'cdli': (AtfCDLILexer, AtfCDLIParser),
+    'oracc': (AtfOraccLexer, AtfOraccParser),
+}
+
+# Per-thread cache of ready (lexer, parser) pairs, keyed by ATF type.
+# Building them runs PLY's reflection and table loading, which costs far
+# more than lexing and parsing a typical text. A PLY lexer or parser keeps
+# the state of the input it is working through on itself, as do ours, so
+# each thread needs its own pair.
+_lexer_parser_cache = threading.local()
+
+
+def get_lexer_parser(atftype='oracc', skip=False):
+    """
+    Return a (lexer, parser) pair for the given ATF type, building it on
+    first use and resetting it on every later use in this thread.
+    """
+    try:
+        cache = _lexer_parser_cache.pairs
+    except AttributeError:
+        cache = _lexer_parser_cache.pairs = {}
+    try:
+        atflexer, atfparser = cache[atftype]
+    except KeyError:
+        lexer_class, parser_class = ATF_CLASSES.get(atftype,
+                                                    (AtfLexer, AtfParser))
+        atflexer = lexer_class(skip=skip, debug=False, log=NullLogger())
+        atfparser = parser_class(debug=False, skip=skip, log=NullLogger())
+        cache[atftype] = atflexer, atfparser
+    atflexer.reset(skip)
+    atfparser.reset(skip)
+    return atflexer, atfparser
+
+
+# Signatures of the lexer rules and grammar of each ATF type, which do not
+# change while the process runs
+_grammar_signatures = {}
+
+
+def grammar_signature(atftype='oracc'):
+    """
+    Return a hash of the lexer rules and grammar used for the given ATF
+    type, which changes whenever either of them does.
+    """
+    try:
+        return _grammar_signatures[atftype]
+    except KeyError:
+        lexer_class, parser_class = ATF_CLASSES.get(atftype,
+                                                    (AtfLexer, AtfParser))
+        signature = hashlib.sha1('{0} {1}'.format(
+            lexer_signature(lexer_class),
+            parser_signature(parser_class)).encode('utf-8')).hexdigest()
+        _grammar_signatures[atftype] = signature
+        return signature
 
 
 class AtfFile(object):
-    template = Template("${text.serialize()}")
-    def __init__(self, content, atftype='oracc', debug=False,skip=False):
+    """
+    A parsed ATF document. engine chooses how it is lexed: 'ply' with the
+    PLY lexer alone, or 'line' with the line engine (see atflinelex),
+    which gives the same tokens faster.
+    """
+
+    def __init__(self, content, atftype='oracc', debug=False,skip=False,
+                 lineno=1, log=None, engine='ply'):
+        if engine not in ENGINES:
+            raise ValueError("Unknown lexer engine: {0}".format(engine))
         if content[-1] != '\n':
             content += "\n"
-        if atftype == 'cdli':
-            atflexer=AtfCDLILexer(debug=debug, skip=skip,log=log)
-            atfparser=AtfCDLIParser(debug=debug, skip=skip,log=log)
-        elif atftype == 'oracc':
-            atflexer=AtfOraccLexer(debug=debug, skip=skip,log=log)
-            atfparser=AtfOraccParser(debug=debug, skip=skip,log=log) 
+        if debug:
+            if log is None:
+                log = debug_logger()
+            # Debug output is produced while the tables are built, so
+            # never reuse the cached instances here
+            lexer_class, parser_class = ATF_CLASSES.get(atftype,
+                                                        (AtfLexer, AtfParser))
+            atflexer = lexer_class(debug=debug, skip=skip, log=log)
+            atfparser = parser_class(debug=debug, skip=skip, log=log)
         else:
-            atflexer=AtfLexer(debug=debug, skip=skip,log=log)
-            atfparser=AtfParser(debug=debug, skip=skip,log=log) 
-        lexer = atflexer.lexer
+            atflexer, atfparser = get_lexer_parser(atftype, skip)
+        if engine == 'line':
+            lexer = AtfLineLexer(atflexer)
+        else:
+            lexer = atflexer.lexer
+        # Texts cut out of a larger file report lines of that file
+        lexer.lineno = lineno
         parser = atfparser.parser
         self.errors_lex=atflexer.errors 
         self.errors_yacc=atfparser.errors 
+        self.warnings = atfparser.warnings
         if debug:
             self.text = parser.parse(content, lexer=lexer, debug=log)
         else:
             self.text = parser.parse(content, lexer=lexer)
 
     def __str__(self):
-        return AtfFile.template.render_unicode(**vars(self))
+        return serialize(self.text)
 
     def serialize(self):
-        return AtfFile.template.render_unicode(**vars(self))
+        return serialize(self.text)
+
+    def write_to(self, fp):
+        """
+        Write the serialized text to fp as it is produced, rather than
+        building it in memory first as serialize() does.
+        """
+        write_to(self.text, fp)
 
 
-def check_atf(infile, atftype, verbose=False,skip=False):
+def check_atf(infile, atftype, verbose=False,skip=False, log=None):
     content = codecs.open(infile,
                           encoding='utf-8-sig').read()
-    atffile=AtfFile(content, atftype, verbose,skip)
+    return check_atf_text(content, atftype, verbose, skip, log=log)
+
+
+def check_atf_text(content, atftype, verbose=False, skip=False, lineno=1,
+                   log=None):
+    """
+    Parse content and return its LEX errors, its YACC errors and its
+    warnings, a list of CDLIWarnings which is only ever filled for CDLI.
+    """
+    atffile=AtfFile(content, atftype, verbose,skip, lineno, log)
     errors_lex=atffile.errors_lex
     errors_yacc=atffile.errors_yacc
-    return errors_lex,errors_yacc
+    return errors_lex,errors_yacc,atffile.warnings
 
 
 if __name__ == "__main__":
@@ -20,23 +20,35 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 # -*- coding: utf-8 -*-
 from __future__ import print_function
 
-import ply.lex as lex
 import re
+
+import ply.lex as lex
 import warnings
 from pyoracc import _pyversion
 from pyoracc.atf.common.atflexicon import AtfLexicon
+from pyoracc.atf.common.plytables import build_lexer
 from pyoracc.tools.logtemplate import LogTemplate
 
 
+# Split the words of a line on the spaces and tabs between them
+split_words = re.compile(r'[^\ \t]+').findall
+
+
+def keyword_dict(tokens, extra):
+    keywords = {token.lower(): token for token in tokens}
+    firstcap = {token.title(): token for token in tokens}
+    keywords.update(firstcap)
+    keywords.update(extra)
+    return keywords
+
+
 class AtfLexer(object):
+    # Module, without the Python version, of the table of this lexer
+    lextab = 'pyoracc.atf.common.lextab'
 
 
     def _keyword_dict(self, tokens, extra):
-        keywords = {token.lower(): token for token in tokens}
-        firstcap = {token.title(): token for token in tokens}
-        keywords.update(firstcap)
-        keywords.update(extra)
-        return keywords
+        return keyword_dict(tokens, extra)
 
     def resolve_keyword(self, value, source, fallback=None, extra=None):
         if extra is None:
@@ -71,6 +83,35 @@ class AtfLexer(object):
 
     states = AtfLexicon.STATES
 
+    # Keyword lookups used by the ID-like rules, built once here rather
+    # than on every token
+    id_keywords = keyword_dict(protocol_keywords + dollar_keywords +
+                               structures + long_argument_structures,
+                               {'fragments': "FRAGMENT",
+                                "parallel": "PARALLEL"})
+
+    transctrl_keywords = keyword_dict(protocol_keywords + dollar_keywords +
+                                      structures + translation_keywords +
+                                      long_argument_structures,
+                                      {'fragments': "FRAGMENT"})
+
+    atid_keywords = keyword_dict(structures + long_argument_structures,
+                                 {"h1": "HEADING",
+                                  "h2": "HEADING",
+                                  "h3": "HEADING",
+                                  "label+": "LABEL",
+                                  "end": "END"})
+
+    hashid_keywords = keyword_dict(protocols, {'CHECK': 'CHECK'})
+
+    # Since @structure tokens are so important to the grammar,
+    # the keywords refering to structural elements in strict dollar
+    # lines must be DIFFERENT TOKENS IN THE LEXER
+    reference_types = frozenset(structures + long_argument_structures) - \
+        {"NOTE"}
+
+    flagged_types = frozenset(long_argument_structures + ["NOTE"])
+
     t_AMPERSAND = "\&"
     t_HASH = "\#"
     t_EXCLAIM = "\!"
@@ -126,17 +167,7 @@ class AtfLexer(object):
         '^\@[a-zA-Z][a-zA-Z0-9\[\]]*\+?'
         t.value = t.value[1:]
         t.lexpos += 1
-        t.type = self.resolve_keyword(t.value,
-                                      AtfLexer.structures +
-                                      AtfLexer.long_argument_structures,
-                                      extra={
-                                          "h1": "HEADING",
-                                          "h2": "HEADING",
-                                          "h3": "HEADING",
-                                          "label+": "LABEL",
-                                          "end": "END"
-                                      },
-                                      )
+        t.type = self.atid_keywords.get(t.value)
 
         if t.type == "INCLUDE":
             t.lexer.push_state('nonequals')
@@ -156,7 +187,7 @@ class AtfLexer(object):
         if t.type == "SCORE":
             t.lexer.push_state('score')
 
-        if t.type in AtfLexer.long_argument_structures + ["NOTE"]:
+        if t.type in self.flagged_types:
             t.lexer.push_state('flagged')
         if t.type is None:
             wrong_value=t.value[0]
@@ -183,9 +214,7 @@ class AtfLexer(object):
         t.lexpos += 1
         # Use lower here since there are some ATF files with
         # the protocol incorrectly written as #NOTE:
-        t.type = self.resolve_keyword(t.value.lower(),
-                                      AtfLexer.protocols,
-                                      extra={'CHECK': 'CHECK'})
+        t.type = self.hashid_keywords.get(t.value.lower())
         if t.type == "KEY":
             t.lexer.push_state('nonequals')
         if t.type == "LEM":
@@ -226,25 +255,12 @@ class AtfLexer(object):
         u'[a-zA-Z0-9][a-zA-Z\'\u2019\xb4\/\.0-9\:\-\[\]_\u2080-\u2089]*'
         t.value = t.value.replace(u'\u2019', "'")
         t.value = t.value.replace(u'\xb4', "'")
-        t.type = self.resolve_keyword(t.value,
-                                      AtfLexer.protocol_keywords +
-                                      AtfLexer.dollar_keywords +
-                                      AtfLexer.structures +
-                                      AtfLexer.long_argument_structures, 'ID',
-                                      extra={
-                                          'fragments': "FRAGMENT",
-                                          "parallel": "PARALLEL"
-                                      },
-                                      )
+        t.type = self.id_keywords.get(t.value, 'ID')
         # print("id " + t.value + t.type)
-        if t.type in ['LANG']:
+        if t.type == 'LANG':
             t.lexer.push_state('flagged')
 
-        if t.type in set(AtfLexer.structures +
-                         AtfLexer.long_argument_structures) - {"NOTE"}:
-            # Since @structure tokens are so important to the grammar,
-            # the keywords refering to structural elements in strict dollar
-            # lines must be DIFFERENT TOKENS IN THE LEXER
+        if t.type in self.reference_types:
             t.type = "REFERENCE"
         # print("id " + t.value + t.type)
         return t
@@ -275,14 +291,7 @@ class AtfLexer(object):
         t.value = t.value.replace(u'\u2032', "'")
         t.value = t.value.replace(u'\u02CA', "'")
         t.value = t.value.replace(u'\xb4', "'")
-        t.type = self.resolve_keyword(t.value,
-                                      AtfLexer.protocol_keywords +
-                                      AtfLexer.dollar_keywords +
-                                      AtfLexer.structures +
-                                      AtfLexer.translation_keywords +
-                                      AtfLexer.long_argument_structures, 'ID',
-                                      extra={'fragments': "FRAGMENT"}
-                                      )
+        t.type = self.transctrl_keywords.get(t.value, 'ID')
 
         if t.type == "LABELED":
             t.lexer.pop_state()
@@ -293,11 +302,7 @@ class AtfLexer(object):
             t.lexer.push_state('parallel')
             t.lexer.push_state('transctrl')
 
-        if t.type in set(AtfLexer.structures +
-                         AtfLexer.long_argument_structures) - {"NOTE"}:
-            # Since @structure tokens are so important to the grammar,
-            # the keywords refering to structural elements in strict dollar
-            # lines must be DIFFERENT TOKENS IN THE LEXER
+        if t.type in self.reference_types:
             t.type = "REFERENCE"
         return t
 
@@ -306,6 +311,7 @@ class AtfLexer(object):
     def t_parallel_LINELABEL(self, t):
         r'^([^\.\ \t]*)\.[\ \t]*'
         t.value = t.value.strip(" \t.")
+        self.translation_line = True
         return t
 
     def t_parallel_labeled_DOLLAR(self, t):
@@ -325,6 +331,8 @@ class AtfLexer(object):
     def t_parallel_NEWLINE(self, t):
         r'\s*[\n\r](?![ \t])'
         t.lexer.lineno += t.value.count("\n")
+        self.translation_line = False
+        self.in_reference = False
         return t
 
     # In interlinear states, a newline which is not continuation leaves state
@@ -361,6 +369,13 @@ class AtfLexer(object):
         t.value = t.value.replace("\n ", "\n")
         t.value = t.value.replace("\n", " ")
         t.value = t.value.replace("\r", " ")
+        # The text of a line of a parallel translation, outside its ^1^
+        # references, is its only word, as the words of a transliteration
+        # line are given together
+        if self.translation_line and not self.in_reference and \
+                t.lexer.lexstate == 'parallel':
+            t.type = 'WORDS'
+            t.value = [t.value]
         return t
 
     def t_parallel_labeled_AMPERSAND(self, t):
@@ -401,7 +416,13 @@ class AtfLexer(object):
     t_flagged_EXCLAIM = "\!"
     t_flagged_QUERY = "\?"
     t_flagged_STAR = "\*"
-    t_flagged_parallel_para_HAT = "[\ \t]*\^[\ \t]*"
+
+    def t_flagged_parallel_para_HAT(self, t):
+        "[\ \t]*\^[\ \t]*"
+        if t.lexer.lexstate == 'parallel':
+            self.in_reference = not self.in_reference
+        return t
+
     t_flagged_EQUALS = "\="
     # --- Rules for paragaph state----------------------------------
     # Free text, ended by double new line
@@ -453,12 +474,18 @@ class AtfLexer(object):
         return t
 
     # --- RULES FOR THE text STATE ----
-    t_text_ID = "[^\ \t \n\r]+"
-
     def t_text_SPACE(self, t):
         r'[\ \t]'
         # No token generated
 
+    # All the words of a line come as one token, up to the whitespace
+    # which NEWLINE takes, so that the parser does not take a step for
+    # each word
+    def t_text_WORDS(self, t):
+        r'[^\ \t\n\r]+(?:[\ \t]+(?!\s*[\n\r])[^\ \t\n\r]+)*'
+        t.value = split_words(t.value)
+        return t
+
     # --- RULES FOR THE lemmatize STATE
     t_lemmatize_ID = "[^\;\n\r]+"
     t_lemmatize_SEMICOLON = r'\;[\ \t]*'
@@ -478,6 +505,23 @@ class AtfLexer(object):
     def __init__(self, skip=False, debug=0, log=lex.NullLogger()):
         self.skip = skip
         self.errors=[] #error list
+        # Whether a line of a parallel translation, and within it a ^1^
+        # reference, is being lexed
+        self.translation_line = False
+        self.in_reference = False
         self.log_tmp=LogTemplate()
-        self.lexer = lex.lex(module=self, reflags=re.MULTILINE, debug=debug,
-                             debuglog=log)
+        self.lexer = build_lexer(self, debug, log)
+
+    def reset(self, skip=False):
+        """
+        Prepare the lexer for a new input so that one instance can be reused
+        across documents without rebuilding the PLY tables.
+        """
+        self.skip = skip
+        # A fresh list, as callers may still hold the previous error list
+        self.errors = []
+        self.translation_line = False
+        self.in_reference = False
+        self.lexer.lexstatestack = []
+        self.lexer.begin('INITIAL')
+        self.lexer.lineno = 1
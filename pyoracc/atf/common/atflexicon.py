@@ -10,7 +10,7 @@ class AtfLexicon(object):
                    'MULTILINGUAL', 'LSQUARE', 'RSQUARE', 'EXCLAIM', 'QUERY',
                    'STAR', 'RANGE', 'HASH', 'NEWLINE',
                    'REFERENCE', 'MINUS', 'FROM', 'TO', 'PARBAR', 'OPENR',
-                   'CLOSER', 'COMMA', 'COMMENT', 'EQUALBRACE']
+                   'CLOSER', 'COMMA', 'COMMENT', 'EQUALBRACE', 'WORDS']
 
     STRUCTURES = ['TABLET', 'ENVELOPE', 'PRISM', 'BULLA', 'OBVERSE', 'REVERSE',
                   'LEFT', 'RIGHT', 'TOP', 'BOTTOM',
@@ -0,0 +1,226 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+# ATF is line oriented: at the start of a line in the INITIAL state, the
+# rule which matches there decides how the rest of the line is lexed. Most
+# tokens come from a few kinds of line, above all transliterations
+# ("1. a-na {d}utu") and lemmatisations ("#lem: ana[to]PRP; Shamash[1]DN"),
+# on which PLY tries its master regular expression for the state at every
+# token and space, and pushes and pops a state for each line. The line
+# engine looks up which rule PLY would use at the start of each line and
+# scans lines of those kinds itself, a whole line at a time, giving the
+# tokens PLY would give. Every other line, and any line it cannot finish,
+# is left to PLY.
+
+import re
+from functools import partial
+from itertools import chain
+
+from ply.lex import LexToken
+
+from pyoracc.atf.common.atflex import split_words
+from pyoracc.atf.common.plytables import LEXER_REFLAGS
+
+# Names of the lexer engines AtfFile can use
+ENGINES = ('ply', 'line')
+
+
+def strip(value):
+    return value.strip()
+
+
+class AtfLineLexer(object):
+    """
+    Lexer giving the same tokens as the PLY lexer of atflexer, an AtfLexer,
+    which it shares its input, position, line number and state with.
+    """
+
+    def __init__(self, atflexer):
+        self.atflexer = atflexer
+        self.lexer = atflexer.lexer
+        rules = type(atflexer)
+        newline = \
+            rules.t_flagged_text_lemmatize_transctrl_nonequals_absorb_NEWLINE
+        # For each state a line is scanned in, the rules of the state in the
+        # order PLY tries them, and for the tokens whose rule changes their
+        # value, what it does to it. The spaces before the words in text,
+        # which give no token, are taken with them: if NEWLINE does not
+        # match at the first space it matches at none of the others, and a
+        # word follows.
+        self.states = {
+            'text': (self.compile(
+                ('NEWLINE', newline.__doc__),
+                ('WORDS', rules.t_text_WORDS.__doc__,
+                 '(?:{0})*'.format(rules.t_text_SPACE.__doc__))),
+                {'WORDS': split_words}),
+            'lemmatize': (self.compile(
+                ('NEWLINE', newline.__doc__),
+                ('SEMICOLON', rules.t_lemmatize_SEMICOLON),
+                ('ID', rules.t_lemmatize_ID)), {}),
+            'nonequals': (self.compile(
+                ('NEWLINE', newline.__doc__),
+                ('ID', rules.t_nonequals_ID.__doc__),
+                ('EQUALS', rules.t_nonequals_EQUALS)), {'ID': strip}),
+            'absorb': (self.compile(
+                ('NEWLINE', newline.__doc__),
+                ('ID', rules.t_absorb_ID.__doc__)), {'ID': strip}),
+        }
+        # The state each protocol scanned here puts the lexer in
+        self.protocol_states = {
+            'LEM': 'lemmatize',
+            'KEY': 'nonequals',
+            'CHECK': 'absorb',
+        }
+        self.scanners = {
+            't_LINELABEL': self.scan_text_line,
+            't_INITIAL_parallel_labeled_COMMENT': self.scan_comment_line,
+            't_INITIAL_parallel_labeled_HASHID': self.scan_protocol_line,
+        }
+        self.tokens = iter(())
+        self.token = partial(next, self.tokens, None)
+
+    @staticmethod
+    def compile(*rules):
+        """
+        Return a regular expression matching any of rules, each a token
+        type and its regular expression, and optionally one for what may
+        come before the token and is skipped.
+        """
+        pattern = []
+        for rule in rules:
+            skipped = rule[2] if len(rule) > 2 else ''
+            pattern.append('{0}(?P<{1}>{2})'.format(skipped, rule[0], rule[1]))
+        return re.compile('|'.join(pattern), LEXER_REFLAGS)
+
+    @property
+    def lineno(self):
+        return self.lexer.lineno
+
+    @lineno.setter
+    def lineno(self, value):
+        self.lexer.lineno = value
+
+    @property
+    def lexpos(self):
+        return self.lexer.lexpos
+
+    def input(self, data):
+        self.lexer.input(data)
+        # Lines are lexed one at a time, and their tokens handed out by
+        # chain and next themselves rather than a method called per token
+        self.tokens = chain.from_iterable(self.lines())
+        self.token = partial(next, self.tokens, None)
+
+    def __iter__(self):
+        return self.tokens
+
+    def __next__(self):
+        return next(self.tokens)
+
+    next = __next__
+
+    def scan(self, state, data, start, tokens):
+        """
+        Add to tokens those of the line from start on, lexed in state up to
+        the NEWLINE which ends the line and returns to INITIAL, move past
+        it and return tokens. If the line does not end, return None having
+        moved nowhere.
+        """
+        pattern, values = self.states[state]
+        lexer = self.lexer
+        lineno = lexer.lineno
+        append = tokens.append
+        for match in pattern.finditer(data, start):
+            kind = match.lastgroup
+            token = LexToken()
+            token.type = kind
+            token.value = value = match.group(kind)
+            token.lineno = lineno
+            token.lexpos = match.start(kind)
+            append(token)
+            if kind in values:
+                token.value = values[kind](value)
+                token.lexer = lexer
+            elif kind == 'NEWLINE':
+                token.lexer = lexer
+                lexer.lineno = lineno + value.count("\n")
+                lexer.lexpos = match.end()
+                return tokens
+        return None
+
+    def first_token(self, kind, value, lexpos):
+        token = LexToken()
+        token.type = kind
+        token.value = value
+        token.lineno = self.lexer.lineno
+        token.lexpos = lexpos
+        token.lexer = self.lexer
+        return [token]
+
+    def scan_text_line(self, data, match):
+        tokens = self.first_token('LINELABEL', match.group()[:-1],
+                                  match.start())
+        return self.scan('text', data, match.end(), tokens)
+
+    def scan_comment_line(self, data, match):
+        tokens = self.first_token('COMMENT', match.group(), match.start())
+        return self.scan('absorb', data, match.end(), tokens)
+
+    def scan_protocol_line(self, data, match):
+        value = match.group()[1:-1]
+        kind = self.atflexer.hashid_keywords.get(value.lower())
+        state = self.protocol_states.get(kind)
+        if state is None:
+            return None
+        tokens = self.first_token(kind, value, match.start() + 1)
+        return self.scan(state, data, match.end(), tokens)
+
+    def scanner(self, data, pos):
+        """
+        Return the tokens of the line starting at pos if it is one the line
+        engine scans itself, or else None.
+        """
+        for lexre, lexindexfunc in self.lexer.lexstatere['INITIAL']:
+            match = lexre.match(data, pos)
+            if match:
+                func = lexindexfunc[match.lastindex][0]
+                scanner = func and self.scanners.get(func.__name__)
+                return scanner and scanner(data, match)
+        return None
+
+    def lines(self):
+        """
+        Yield the tokens of the input a line at a time, or one at a time
+        where PLY lexes it.
+        """
+        lexer = self.lexer
+        data = lexer.lexdata
+        length = len(data)
+        while lexer.lexpos < length:
+            pos = lexer.lexpos
+            if lexer.lexstate == 'INITIAL' and \
+                    (pos == 0 or data[pos - 1] == '\n'):
+                tokens = self.scanner(data, pos)
+                if tokens is not None:
+                    yield tokens
+                    continue
+            token = lexer.token()
+            if token is None:
+                return
+            yield (token,)
@@ -22,6 +22,7 @@ from pyoracc import _pyversion
 from pyoracc.atf.common.atflexicon import AtfLexicon
 
 from pyoracc.model.comment import Comment
+from pyoracc.model.implicitobject import ImplicitObject
 from pyoracc.model.composite import Composite
 from pyoracc.model.line import Line
 from pyoracc.model.link import Link
@@ -39,13 +40,30 @@ from pyoracc.model.translation import Translation
 from pyoracc.tools.logtemplate import LogTemplate
 class AtfParser(object):
     tokens = AtfLexicon.TOKENS
+    # Module of the parse table of this grammar, written by
+    # pyoracc._generate_parsetab()
+    tabmodule = 'pyoracc.atf.common.parsetab'
 
     def __init__(self, debug=0, skip=False, log=yacc.NullLogger()):
         self.skip=skip
         self.errors=[] #error list
+        # Problems which do not stop the text from being parsed, as
+        # CDLIWarnings; only the CDLI parser finds any
+        self.warnings = []
         self.log_tmp=LogTemplate()
-        self.parser = yacc.yacc(module=self, tabmodule='pyoracc.atf.parsetab',
-                                debug=debug, debuglog=log)
+        self.parser = yacc.yacc(module=self, tabmodule=self.tabmodule,
+                                debug=debug, debuglog=log,
+                                write_tables=False)
+
+    def reset(self, skip=False):
+        """
+        Prepare the parser for a new document so that one instance can be
+        reused without reloading the parse tables.
+        """
+        self.skip = skip
+        # Fresh lists, as callers may still hold the previous ones
+        self.errors = []
+        self.warnings = []
 
     def p_document(self, p):
         """document : text
@@ -156,18 +174,22 @@ class AtfParser(object):
         # Default to a tablet
 
         # Has a default already been added?
-        if not p[0].objects():
-            p[0].children.append(OraccObject("tablet"))
-        p[0].objects()[-1].children.append(p[2])
+        target = p[0].last_object()
+        if target is None:
+            target = ImplicitObject("tablet")
+            p[0].children.append(target)
+        target.children.append(p[2])
 
     def p_text_surface_element(self, p):
         """text : text surface_element %prec OBJECT"""
         p[0] = p[1]
-        if not p[0].objects():
-            p[0].children.append(OraccObject("tablet"))
+        target = p[0].last_object()
+        if target is None:
+            target = ImplicitObject("tablet")
+            p[0].children.append(target)
         # Default to obverse of a tablet
-        p[0].objects()[-1].children.append(OraccObject("obverse"))
-        p[0].objects()[-1].children[0].children.append(p[2])
+        target.children.append(ImplicitObject("obverse"))
+        target.children[0].children.append(p[2])
 
     def p_text_composite(self, p):
         """text : text COMPOSITE newline"""
@@ -248,7 +270,7 @@ class AtfParser(object):
         """object : object surface_element %prec SURFACE"""
         p[0] = p[1]
         # Default surface is obverse
-        p[0].children.append(OraccObject("obverse"))
+        p[0].children.append(ImplicitObject("obverse"))
         p[0].children[0].children.append(p[2])
 
     def p_surface_statement(self, p):
@@ -302,20 +324,16 @@ class AtfParser(object):
         p[0].children.append(p[2])
         # WE DO NOT YET HANDLE @M=DIVSION lines.
 
-    def p_linelabel(self, p):
-        "line_sequence : LINELABEL ID"
+    def p_linelabel_words(self, p):
+        """line_sequence : LINELABEL WORDS
+                         | SCORELABEL WORDS"""
         p[0] = Line(p[1])
-        p[0].words.append(p[2])
+        p[0].words = p[2]
 
-    def p_scorelabel(self, p):
-        "line_sequence : SCORELABEL ID"
-        p[0] = Line(p[1])
-        p[0].words.append(p[2])
-
-    def p_line_id(self, p):
-        "line_sequence : line_sequence ID"
+    def p_line_words(self, p):
+        "line_sequence : line_sequence WORDS"
         p[0] = p[1]
-        p[0].words.append(p[2])
+        p[0].words.extend(p[2])
 
     def p_line_reference(self, p):
         "line_sequence : line_sequence reference"
@@ -366,8 +384,8 @@ class AtfParser(object):
     def p_equalbrace(self, p):
         "equalbrace : EQUALBRACE"
 
-    def p_equalbrace_ID(self, p):
-        "equalbrace : equalbrace ID"
+    def p_equalbrace_words(self, p):
+        "equalbrace : equalbrace WORDS"
 
     def p_equalbrace_statement(self, p):
         "equalbrace_statement : equalbrace newline"
@@ -382,13 +400,9 @@ class AtfParser(object):
         # The actual label is the same as the main line
 
     def p_multilingual_sequence(self, p):
-        "multilingual_sequence : MULTILINGUAL ID "
-        p[0] = Line(p[2][1:])  # Slice off the percent
-
-    def p_multilingual_id(self, p):
-        "multilingual_sequence : multilingual_sequence ID"
-        p[0] = p[1]
-        p[0].words.append(p[2])
+        "multilingual_sequence : MULTILINGUAL WORDS"
+        p[0] = Line(p[2][0][1:])  # Slice off the percent
+        p[0].words = p[2][1:]
 
     def p_multilingual_reference(self, p):
         "multilingual_sequence : multilingual_sequence reference"
@@ -827,7 +841,9 @@ class AtfParser(object):
     )
 
     def p_error(self, p):
-        wrong_value=p.value[0]
+        # The value of WORDS is the list of words of a line
+        value = p.value[0] if p.type == 'WORDS' else p.value
+        wrong_value=value[0]
         if self.skip:
             self.errors.append((wrong_value,p.lineno, p.lexpos, p.type))
             while True:
@@ -0,0 +1,157 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+# The lexer and parser tables PLY builds from the rules of each ATF dialect
+# are written into the dialect's package when pyoracc is built (see
+# pyoracc._generate_parsetab) and loaded from there at runtime, so a new
+# process imports them rather than analysing the rules again. Nothing is
+# written at runtime: a missing or outdated table only means the rules are
+# analysed in memory, as they would be without tables.
+#
+# PLY checks a parse table against a signature of the grammar itself but
+# takes a lexer table on trust, so each lexer table carries a signature of
+# the rules it was built from, and is only used while they still match.
+
+import hashlib
+import os
+import re
+import sys
+
+import ply.lex as lex
+import ply.yacc as yacc
+
+from pyoracc import _pyversion
+
+LEXER_REFLAGS = re.MULTILINE
+
+
+def package_dir(tabmodule):
+    """
+    Return the folder of the package holding the module tabmodule.
+    """
+    package = tabmodule.rsplit('.', 1)[0]
+    __import__(package)
+    return os.path.dirname(os.path.abspath(sys.modules[package].__file__))
+
+
+def lextab_name(lexer):
+    """
+    Return the name of the table module of lexer. PLY writes the regular
+    expressions of the rules as string literals, which Python 2 and 3 read
+    differently, so each has its own table.
+    """
+    return '{0}{1}'.format(lexer.lextab, _pyversion())
+
+
+def lexer_signature(lexer):
+    """
+    Return a hash of everything in the rules of lexer which goes into its
+    table, in the order PLY considers the rules in.
+    """
+    rules = []
+    for name in sorted(dir(lexer)):
+        if not name.startswith('t_'):
+            continue
+        rule = getattr(lexer, name)
+        if callable(rule):
+            code = getattr(rule, '__code__', None)
+            rules.append((name, getattr(rule, 'regex', rule.__doc__),
+                          code and code.co_firstlineno))
+        else:
+            rules.append((name, rule))
+    spec = (lexer.tokens, lexer.states, getattr(lexer, 'literals', ''),
+            LEXER_REFLAGS, rules)
+    return hashlib.sha1(repr(spec).encode('utf-8')).hexdigest()
+
+
+def parser_signature(parser):
+    """
+    Return a hash of the grammar of parser, which PLY signs its parse table
+    with.
+    """
+    pdict = dict((name, getattr(parser, name)) for name in dir(parser))
+    info = yacc.ParserReflect(pdict, log=yacc.NullLogger())
+    info.get_all()
+    return hashlib.sha1(info.signature().encode('utf-8')).hexdigest()
+
+
+def load_lexer(lexer):
+    """
+    Return the PLY lexer for the rules of lexer built from its table, or
+    None if there is no table for the rules as they are now.
+    """
+    name = lextab_name(lexer)
+    try:
+        __import__(name)
+    except ImportError:
+        return None
+    table = sys.modules[name]
+    if (getattr(table, '_tabversion', None) != lex.__tabversion__ or
+            getattr(table, '_signature', None) != lexer_signature(lexer)):
+        return None
+    return lex.lex(module=lexer, optimize=1, lextab=table,
+                   errorlog=lex.NullLogger())
+
+
+def build_lexer(lexer, debug=0, log=None):
+    """
+    Return the PLY lexer for the rules of lexer, from its table if there
+    is one which is up to date. With debug the rules are always analysed,
+    as that is what produces the debug output.
+    """
+    if not debug:
+        built = load_lexer(lexer)
+        if built is not None:
+            return built
+    return lex.lex(module=lexer, reflags=LEXER_REFLAGS, debug=debug,
+                   debuglog=log)
+
+
+def write_lextab(lexer):
+    """
+    Write the table of lexer into its package, for this Python version.
+    """
+    name = lextab_name(lexer)
+    built = lex.lex(module=lexer, reflags=LEXER_REFLAGS)
+    outputdir = package_dir(name)
+    built.writetab(name, outputdir)
+    filename = os.path.join(outputdir, name.rsplit('.', 1)[-1] + '.py')
+    with open(filename, 'a') as table:
+        table.write('_signature = {0!r}\n'.format(lexer_signature(lexer)))
+
+
+def write_parsetab(parser):
+    """
+    Write the table of parser into its package, unless an up to date one
+    is there already.
+    """
+    yacc.yacc(module=parser, tabmodule=parser.tabmodule, debug=False,
+              write_tables=True, errorlog=yacc.NullLogger())
+
+
+def write_tables():
+    """
+    Write the lexer and parser tables of every ATF dialect.
+    """
+    from pyoracc.atf.common.atffile import ATF_CLASSES, AtfLexer, AtfParser
+    for lexer_class, parser_class in [(AtfLexer, AtfParser)] + \
+            sorted(ATF_CLASSES.values(), key=lambda pair: pair[0].lextab):
+        write_lextab(lexer_class(skip=False, debug=0, log=lex.NullLogger()))
+        write_parsetab(parser_class(debug=0, skip=False,
+                                    log=yacc.NullLogger()))
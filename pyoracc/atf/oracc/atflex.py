@@ -2,6 +2,7 @@ from pyoracc.atf.common.atflex import AtfLexer
 
 
 class AtfOraccLexer(AtfLexer):
+    lextab = 'pyoracc.atf.oracc.lextab'
 
     def __init__(self, skip, debug, log):
         super(AtfOraccLexer, self).__init__(skip, debug, log)
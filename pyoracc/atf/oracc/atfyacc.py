@@ -3,6 +3,7 @@ from pyoracc.atf.common.atfyacc import AtfParser
 
 class AtfOraccParser(AtfParser):
 
+    tabmodule = 'pyoracc.atf.oracc.parsetab'
     tokens = AtfParser.tokens
     precedence = AtfParser.precedence
 
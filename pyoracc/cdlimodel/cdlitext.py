@@ -1,6 +1,7 @@
 from mako.template import Template
 import os
 import pkg_resources
+import threading
 
 resource_package = __name__  # Could be any module/package name
 
@@ -13,10 +14,19 @@ class CDLIText(object):
 ${child.serialize()}
 % endfor""")
 
+    # Support files, and the lookups built from them on first use. These are
+    # shared by all instances so that the files are read once per process,
+    # even when texts are parsed in several threads.
+    ValidPnumbersfilepath = pkg_resources.resource_filename(
+        __name__, 'support_files/ValidPnumbers.txt')
+    PnumberMapfilepath = pkg_resources.resource_filename(
+        __name__, 'support_files/PnumberMap.txt')
+    validPnumbers = None
+    pnumberMap = None
+    _load_lock = threading.Lock()
+
     def __init__(self):
         # CDLI Parameters
-        self.ValidPnumbersfilepath = pkg_resources.resource_filename(__name__, 'support_files/ValidPnumbers.txt')
-        self.PnumberMapfilepath = pkg_resources.resource_filename(__name__, 'support_files/PnumberMap.txt')
         self.pList = None
         self.oldPlist = None
         self.newPlist = None
@@ -38,24 +48,16 @@ ${child.serialize()}
         return formatContent
 
     def FormatPnumber(self, plist):
-        formatPlist = []
-        for pnumber in plist:
-            stringBuilder = "P"
-            length = len(pnumber)
-            for i in range(1, 7 - length):
-                stringBuilder = stringBuilder + "0"
-
-            stringBuilder = stringBuilder + pnumber
-            formatPlist.append(stringBuilder)
-
-        return formatPlist
+        # Pad to six digits, so "1" becomes "P000001"
+        return ["P" + pnumber.zfill(6) for pnumber in plist]
 
     def CheckPnumber(self, pnumber):
-        self.pList = self.ReadPnumbers()
-        if pnumber in self.pList:
-            return True
-        else:
-            return False
+        if CDLIText.validPnumbers is None:
+            with CDLIText._load_lock:
+                if CDLIText.validPnumbers is None:
+                    CDLIText.validPnumbers = frozenset(self.ReadPnumbers())
+        self.pList = CDLIText.validPnumbers
+        return pnumber in self.pList
 
     def ReadPMap(self):
         temp = []
@@ -71,18 +73,24 @@ ${child.serialize()}
 
         return oldPlist, newPlist
 
-    def CheckPMap(self, pnumber):
-        self.oldPlist, self.newPlist = self.ReadPMap()
+    def ReadPMapDict(self):
+        pmap = {}
+        for old, new in zip(*self.ReadPMap()):
+            # The first mapping of an old P-number wins
+            pmap.setdefault(old, new)
+        return pmap
 
-        foundMap = False
+    def CheckPMap(self, pnumber):
+        if CDLIText.pnumberMap is None:
+            with CDLIText._load_lock:
+                if CDLIText.pnumberMap is None:
+                    CDLIText.pnumberMap = self.ReadPMapDict()
 
-        if pnumber in self.oldPlist:
-            foundMap = True
+        newPnumber = CDLIText.pnumberMap.get(pnumber)
 
-        if foundMap:
-            index = self.oldPlist.index(pnumber)
-            temp = "Replace Old Pnumber : " + pnumber + " with New Pnumber : " + self.newPlist[index]
-            return self.newPlist[index], True, temp
+        if newPnumber is not None:
+            temp = "Replace Old Pnumber : " + pnumber + " with New Pnumber : " + newPnumber
+            return newPnumber, True, temp
         else:
             if self.CheckPnumber(pnumber):
                 return pnumber, True, None
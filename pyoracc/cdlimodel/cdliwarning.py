@@ -0,0 +1,16 @@
+from collections import namedtuple
+
+
+class CDLIWarning(namedtuple('CDLIWarning',
+                             'code pnumber category message')):
+    """
+    A problem found in a CDLI text which does not stop it from being
+    parsed. code names the check which failed (e.g. "surface-specific"),
+    pnumber is the P-number of the text, category what the warning is about
+    (e.g. "Prism") and message says what is wrong.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return "%s: %s Warning: %s" % (self.pnumber, self.category,
+                                       self.message)
@@ -1,131 +1,171 @@
-from mako.template import Template
-
-from collections import defaultdict
-import re
-
-
-class Structure(object):
-    template = Template("""&${code} = ${description}
-#project: ${project}
-#atf: lang ${language}
-% for child in children:
-${child.serialize()}
-% endfor""")
-
-    def __init__(self):
-        self.newtext_status = True
-        self.surfaceList = list()
-        self.objectType = ""
-        self.errorText = ""
-        self.columnCounter = 0
-        self.pnumber = ""
-
-    def __str__(self):
-        return Structure.template.render_unicode(**vars(self))
-
-    def serialize(self):
-        return Structure.template.render_unicode(**vars(self))
-
-    def IncrementColumnCounter(self):
-        self.columnCounter = self.columnCounter + 1
-
-    def ResetColumnCounter(self):
-        self.columnCounter = 0
-
-    def UpdatePnumber(self, pnumber):
-        self.pnumber = pnumber
-
-    def SetObjectType(self, roughType):
-        if "@tablet" in roughType:
-            self.objectType = "TABLET"
-        elif "bulla" in roughType:
-            self.objectType = "BULLA"
-        elif "prism" in roughType:
-            self.objectType = "PRISM"
-        elif "barrel" in roughType:
-            self.objectType = "BARREL"
-        elif "cylinder" in roughType:
-            self.objectType = "CYLINDER"
-        elif "brick" in roughType:
-            self.objectType = "BRICK"
-        elif "cone" in roughType:
-            self.objectType = "CONE"
-        elif "sealing" in roughType:
-            self.objectType = "SEALING"
-        elif "seal" in roughType:
-            self.objectType = "SEAL"
-        elif "composite" in roughType:
-            self.objectType = "COMPOSITE"
-
-    def SetSurface(self, surfaceType):
-        self.surfaceList.append(surfaceType.rstrip())
-
-    def ClearData(self):
-        self.surfaceList = list()
-        self.errorText = ""
-        self.objectType = ""
-        self.pnumber = ""
-
-    def CheckSurfaceRules(self):
-        surfaceRegex = re.compile("@surface")
-        specificSurfaceRegex = re.compile("@(obverse|reverse|top|bottom|left|right)")
-        faceSurfaceRegex = re.compile("@face")
-        sealRegex = re.compile("@seal")
-
-        surfaceList = filter(surfaceRegex.match, self.surfaceList)
-        specificSurfaceList = filter(specificSurfaceRegex.match, self.surfaceList)
-        faceSurfaceList = filter(faceSurfaceRegex.match, self.surfaceList)
-        sealList = filter(sealRegex.match, self.surfaceList)
-
-        # print(self.objectType)
-
-        if len(faceSurfaceList) > 0:
-            self.errorText += "%s: General Warning: Surface Type: face is not supported anymore.\n" % self.pnumber
-
-        if self.objectType == "BULLA":
-            if len(surfaceList) > 0 and len(specificSurfaceList) > 0:
-                self.errorText += "%s: Bulla Warning: Both Generic Surface type (ex. @surface) and Specific Surface type (ex. @obverse), cannot be used together.\n" % self.pnumber
-        elif self.objectType == "PRISM":
-            if len(specificSurfaceList) > 0:
-                self.errorText += "%s: Prism Warning: Specific Surface type (ex. @obverse) are not allowed.\n" % self.pnumber
-        elif self.objectType == "BARREL":
-            if len(specificSurfaceList) > 0:
-                self.errorText += "%s: Barrel Warning: Specific Surface type (ex. @obverse) are not allowed.\n" % self.pnumber
-        elif self.objectType == "CYLINDER":
-            if len(specificSurfaceList) > 0:
-                self.errorText += "%s: Cylinder Warning: Specific Surface type (ex. @obverse) are not allowed.\n" % self.pnumber
-        elif self.objectType == "BRICK":
-            if len(specificSurfaceList) > 0:
-                self.errorText += "%s: Brick Warning: Specific Surface type (ex. @obverse) are not allowed.\n" % self.pnumber
-        elif self.objectType == "CONE":
-            if len(surfaceList) > 2:
-                self.errorText += "%s: Cone Warning: More than 2 Generic Surfaces are not allowed.\n" % self.pnumber
-            if len(specificSurfaceList) > 0:
-                self.errorText += "%s: Cone Warning: Specific Surface type (ex. @obverse) are not allowed.\n" % self.pnumber
-        elif self.objectType == "SEALING":
-            if len(surfaceList) > 1:
-                self.errorText += "%s: Sealing Warning: More than 1 Generic Surfaces are not allowed.\n" % self.pnumber
-            if len(specificSurfaceList) > 0:
-                self.errorText += "%s: Sealing Warning: Specific Surface type (ex. @obverse) are not allowed.\n" % self.pnumber
-            if len(sealList) < 1:
-                self.errorText += "%s: Sealing Warning: There should atleast be one Seal impression.\n" % self.pnumber
-        elif self.objectType == "SEAL":
-            if len(surfaceList) > 1:
-                self.errorText += "%s: Seal Warning: More than 1 Generic Surfaces are not allowed.\n" % self.pnumber
-            if len(specificSurfaceList) > 0:
-                self.errorText += "%s: Seal Warning: Specific Surface type (ex. @obverse) are not allowed.\n" % self.pnumber
-            if len(sealList) > 0:
-                self.errorText += "%s: Seal Warning: There shouldn't be any Seal.\n" % self.pnumber
-        elif self.objectType == "COMPOSITE":
-            if len(surfaceList) > 1:
-                self.errorText += "%s: Composite Warning: More than 1 Generic Surfaces are not allowed.\n" % self.pnumber
-            if len(specificSurfaceList) > 0:
-                self.errorText += "%s: Composite Warning: Specific Surface type (ex. @obverse) are not allowed.\n" % self.pnumber
-            if len(sealList) > 0:
-                self.errorText += "%s: Composite Warning: There shouldn't be any Seal.\n" % self.pnumber
-            if self.columnCounter > 0:
-                self.errorText += "%s: Composite Warning: Columns are not allowed.\n" % self.pnumber
-
-    def PrintResults(self):
-        if not self.errorText == "":
-            print(self.errorText)
+from collections import Counter
+
+from pyoracc.cdlimodel.cdliwarning import CDLIWarning
+from pyoracc.model.composite import Composite
+from pyoracc.model.implicitobject import ImplicitObject
+from pyoracc.model.oraccnamedobject import OraccNamedObject
+from pyoracc.model.oraccobject import OraccObject
+from pyoracc.model.text import Text
+
+# The CDLI rules on which surfaces an object may have. They are checked
+# once a document has been parsed, on the objects of each of its texts:
+# an object's type comes from its name if it has one (e.g. "@object cone")
+# or else its kind (e.g. "@prism"), and its surfaces are counted by kind.
+
+# Words which give the type of an object, in the order they are looked for
+OBJECT_TYPES = (
+    ('bulla', 'Bulla'),
+    ('prism', 'Prism'),
+    ('barrel', 'Barrel'),
+    ('cylinder', 'Cylinder'),
+    ('brick', 'Brick'),
+    ('cone', 'Cone'),
+    ('sealing', 'Sealing'),
+    ('seal', 'Seal'),
+    ('composite', 'Composite'),
+)
+
+# What each kind of surface is counted as
+SURFACE_KINDS = {
+    'surface': 'generic',
+    'obverse': 'specific',
+    'reverse': 'specific',
+    'top': 'specific',
+    'bottom': 'specific',
+    'left': 'specific',
+    'right': 'specific',
+    'face': 'face',
+    'seal': 'seal',
+    'column': 'column',
+}
+
+
+def more_than(kind, limit):
+    return lambda counts: counts[kind] > limit
+
+
+def fewer_than(kind, limit):
+    return lambda counts: counts[kind] < limit
+
+
+def both(kind, other):
+    return lambda counts: counts[kind] > 0 and counts[other] > 0
+
+
+NO_SPECIFIC = ('surface-specific', more_than('specific', 0),
+               "Specific Surface type (ex. @obverse) are not allowed.")
+
+# For each type of object, the rules its surfaces may break, each with the
+# code and message of the warning given when it does
+SURFACE_RULES = {
+    'Bulla': [
+        ('surface-mixed', both('generic', 'specific'),
+         "Both Generic Surface type (ex. @surface) and Specific Surface "
+         "type (ex. @obverse), cannot be used together."),
+    ],
+    'Prism': [NO_SPECIFIC],
+    'Barrel': [NO_SPECIFIC],
+    'Cylinder': [NO_SPECIFIC],
+    'Brick': [NO_SPECIFIC],
+    'Cone': [
+        ('surface-generic', more_than('generic', 2),
+         "More than 2 Generic Surfaces are not allowed."),
+        NO_SPECIFIC,
+    ],
+    'Sealing': [
+        ('surface-generic', more_than('generic', 1),
+         "More than 1 Generic Surfaces are not allowed."),
+        NO_SPECIFIC,
+        ('surface-no-seal', fewer_than('seal', 1),
+         "There should atleast be one Seal impression."),
+    ],
+    'Seal': [
+        ('surface-generic', more_than('generic', 1),
+         "More than 1 Generic Surfaces are not allowed."),
+        NO_SPECIFIC,
+        ('surface-seal', more_than('seal', 0),
+         "There shouldn't be any Seal."),
+    ],
+    'Composite': [
+        ('surface-generic', more_than('generic', 1),
+         "More than 1 Generic Surfaces are not allowed."),
+        NO_SPECIFIC,
+        ('surface-seal', more_than('seal', 0),
+         "There shouldn't be any Seal."),
+        ('surface-column', more_than('column', 0),
+         "Columns are not allowed."),
+    ],
+}
+
+
+def object_type(obj):
+    """
+    Return the type of obj which the surface rules are given for, or None
+    if there are no rules for it.
+    """
+    if isinstance(obj, OraccNamedObject):
+        key = obj.name
+    else:
+        key = obj.objecttype
+    for word, objtype in OBJECT_TYPES:
+        if word in key:
+            return objtype
+    return None
+
+
+def surface_counts(obj):
+    """
+    Count the surfaces of obj by kind. Surfaces the parser added for lines
+    written without one are not counted.
+    """
+    counts = Counter()
+    for child in obj.children:
+        if isinstance(child, OraccObject) and \
+                not isinstance(child, ImplicitObject):
+            kind = SURFACE_KINDS.get(child.objecttype)
+            if kind is not None:
+                counts[kind] += 1
+    return counts
+
+
+def check_object(obj, pnumber):
+    """
+    Return a CDLIWarning for each surface rule broken by obj, which belongs
+    to the text with P-number pnumber.
+    """
+    counts = surface_counts(obj)
+    warnings = []
+    if counts['face']:
+        warnings.append(CDLIWarning(
+            'surface-face', pnumber, 'General',
+            "Surface Type: face is not supported anymore."))
+    objtype = object_type(obj)
+    for code, test, message in SURFACE_RULES.get(objtype, ()):
+        if test(counts):
+            warnings.append(CDLIWarning(code, pnumber, objtype, message))
+    return warnings
+
+
+def check_text(text):
+    """
+    Return the warnings for the surfaces of every object of text.
+    """
+    warnings = []
+    for obj in text.objects():
+        warnings.extend(check_object(obj, text.code))
+    return warnings
+
+
+def check_document(document):
+    """
+    Return the warnings for the surfaces in a parsed document: a text, the
+    texts of a composite, or a single object.
+    """
+    if isinstance(document, Composite):
+        warnings = []
+        for text in document.texts:
+            warnings.extend(check_text(text))
+        return warnings
+    if isinstance(document, Text):
+        return check_text(document)
+    return check_object(document, "")
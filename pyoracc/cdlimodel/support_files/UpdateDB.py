@@ -1,22 +1,28 @@
-import urllib2, urllib
-import requests
+from __future__ import print_function
+
+import io
 import re
 import sys
 
+try:
+    from urllib.request import Request, urlopen
+except ImportError:
+    from urllib2 import Request, urlopen
+
 def update(url):
     path='https://cdli.ucla.edu/atfchecker/'+url    #the url you want to POST to
-    req=urllib2.Request(path)
+    req=Request(path)
     req.add_header("Content-type", "application/x-www-form-urlencoded")
-    page=urllib2.urlopen(req).read()
+    page=urlopen(req).read().decode('utf-8')
 
     if(page.find('Error:') != -1):
-        print "Update Failed.\nPlease contact CDLI."
+        print("Update Failed.\nPlease contact CDLI.")
         sys.exit()
 
     return page
 
 def write_to_file(filename, content):
-    f = open(filename,"w")
+    f = io.open(filename,"w",encoding="utf-8")
     f.write(content)
     f.close()
 
@@ -26,7 +32,7 @@ def clean_qnumbers(text):
 
 if __name__ == "__main__":
     #Updating ValidPnumbers.txt
-    qnumber_string = ""
+    qnumber_string = u""
     write_to_file('ValidPnumbers.txt',update('update_pnumbers.php'))
     qnumbers = clean_qnumbers(update('update_qnumbers.php'))
 
@@ -36,4 +42,4 @@ if __name__ == "__main__":
     write_to_file('ValidQnumbers.txt', qnumber_string)
     write_to_file('PeriodMap.txt',update('update_periodmap.php'))
 
-    print "Support Content Updated"
+    print("Support Content Updated")
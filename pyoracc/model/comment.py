@@ -18,18 +18,26 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-from mako.template import Template
+from .serializer import serialize, text_type, write_to
+from .slots import Slotted
 
 
-class Comment(object):
-    template = Template("""# ${content}""")
+class Comment(Slotted):
+    __slots__ = ('content', 'check')
 
     def __init__(self, content):
         self.content = content
         self.check = False
 
     def __str__(self):
-        return self.template.render_unicode(**vars(self))
+        return serialize(self)
 
     def serialize(self):
-        return self.template.render_unicode(**vars(self))
+        return serialize(self)
+
+    def write_to(self, fp):
+        write_to(self, fp)
+
+    def _write(self, write):
+        write(u"# ")
+        write(text_type(self.content))
@@ -18,6 +18,11 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-class Composite(object):
+from .slots import Slotted
+
+
+class Composite(Slotted):
+    __slots__ = ('texts',)
+
     def __init__(self):
         self.texts = []
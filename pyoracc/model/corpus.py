@@ -21,7 +21,44 @@ from __future__ import print_function
 import sys
 import os
 import codecs
-from pyoracc.atf.common.atffile import AtfFile
+from collections import deque
+from itertools import chain, islice
+from multiprocessing import Pool
+from pyoracc import _pyversion
+from pyoracc.atf.common.atffile import AtfFile, grammar_signature
+from pyoracc.tools.resultcache import ResultCache
+
+
+# Version of the parse trees kept in a cache. The lexer rules and grammar
+# are part of the cache key already; bump this whenever the parser's
+# actions or the model classes change the trees they give.
+TREE_VERSION = 1
+
+
+def tree_kind(atftype):
+    """
+    Return the kind under which the parse trees of atftype are cached.
+    """
+    return 'parse-{0}-{1}'.format(TREE_VERSION, grammar_signature(atftype))
+
+
+def parse_file(args):
+    """
+    Parse a single .atf file, returning the path with the AtfFile and None,
+    or with None and the error raised. Module level so that it can run in a
+    worker process.
+    """
+    path, atftype = args
+    try:
+        content = codecs.open(path, encoding='utf-8-sig').read()
+        return path, AtfFile(content, atftype), None
+    except (SyntaxError, IndexError, AttributeError,
+            UnicodeDecodeError) as e:
+        return path, None, e
+
+
+def parse_files(tasks):
+    return [parse_file(task) for task in tasks]
 
 
 class Corpus(object):
@@ -31,29 +68,174 @@ class Corpus(object):
         self.successes = 0
         self.atftype = kwargs['atftype']
         self.source = kwargs['source']
-        if 'source' in kwargs:
-            for dirpath, _, files in os.walk(self.source):
-                for file in files:
-                    if file.endswith('.atf'):
-                        try:
-                            path = os.path.join(dirpath, file)
-                            print("Parsing file", path, "... ", end="")
-                            content = codecs.open(path,
-                                                  encoding='utf-8-sig').read()
-                            self.texts.append(AtfFile(content, self.atftype))
-
-                            self.successes += 1
-                            print("OK")
-                        except (SyntaxError, IndexError, AttributeError,
-                                UnicodeDecodeError) as e:
-                            self.texts.append(None)
-                            self.failures += 1
-                            print("Failed with message: '{}'".format(e))
+        # Number of processes to parse with, by default parse serially
+        self.workers = kwargs.get('workers')
+        # Number of files sent to a worker at a time
+        self.chunksize = kwargs.get('chunksize')
+        # Number of files parsed ahead of the consumer when iterating; with
+        # workers, never fewer than a chunk for each of them
+        self.prefetch = kwargs.get('prefetch')
+        # A ResultCache, or the path of one, holding the results of
+        # earlier runs; files which have not changed are not parsed again
+        self.cache = kwargs.get('cache')
+        if self.cache is not None and not isinstance(self.cache, ResultCache):
+            self.cache = ResultCache(self.cache)
+        # A lazy corpus parses nothing until it is iterated over, and
+        # keeps none of the parsed texts
+        if 'source' in kwargs and not kwargs.get('lazy'):
+            for path, result in self:
+                report(path, result)
+                if isinstance(result, AtfFile):
+                    self.texts.append(result)
+                else:
+                    self.texts.append(None)
+
+    def __iter__(self):
+        """
+        Yield a (path, AtfFile or error) pair for each file, in path order,
+        one at a time. successes and failures count those of this pass.
+        """
+        self.successes = 0
+        self.failures = 0
+        for path, atffile, e in self.parse(self.paths()):
+            if e is None:
+                self.successes += 1
+                yield path, atffile
+            else:
+                self.failures += 1
+                yield path, e
+
+    def paths(self):
+        """
+        All .atf files under the source directory, in path order.
+        """
+        paths = []
+        for dirpath, _, files in os.walk(self.source):
+            for file in files:
+                if file.endswith('.atf'):
+                    paths.append(os.path.join(dirpath, file))
+        return sorted(paths)
+
+    def parse(self, paths):
+        """
+        Yield the result of parse_file for each path, in the same order.
+        With more than one worker the files are spread over a process
+        pool, chunksize files at a time, with at most prefetch files
+        parsed ahead of the consumer. With a cache, only the files which
+        are not in it are parsed.
+        """
+        if self.cache is None:
+            return self.parse_uncached(paths)
+        return self.parse_cached(paths)
+
+    def parse_cached(self, paths):
+        kind = tree_kind(self.atftype)
+        # Files are looked up in the cache one at a time, as they are
+        # reached or as the pool asks for more to parse. Each one goes into
+        # looked_up in path order, and into unparsed too if it is not in
+        # the cache, from where it is handed to the pool.
+        remaining = iter(paths)
+        looked_up = deque()
+        unparsed = deque()
+
+        def look_up():
+            path = next(remaining, None)
+            if path is None:
+                return False
+            with open(path, 'rb') as atf:
+                key = self.cache.key(atf.read(), self.atftype, kind)
+            hit = key in self.cache
+            looked_up.append((path, key, hit))
+            if not hit:
+                self.cache.misses += 1
+                unparsed.append(path)
+            return True
+
+        def misses():
+            while unparsed or look_up():
+                if unparsed:
+                    yield unparsed.popleft()
+
+        parsed = self.parse_uncached(misses(), len(paths))
+        try:
+            while looked_up or look_up():
+                path, key, hit = looked_up.popleft()
+                if hit:
+                    atffile, e = self.cache.get(key)
+                else:
+                    _, atffile, e = next(parsed)
+                    self.cache.put(key, (atffile, e))
+                yield path, atffile, e
+        finally:
+            # Stops the workers too if abandoned part way through
+            parsed.close()
+            self.cache.commit()
+
+    def parse_uncached(self, paths, count=None):
+        """
+        Yield the result of parse_file for each of paths, which may be a
+        generator, taking no more of them than are about to be parsed.
+        Where paths has no len, count is their number or a bound on it,
+        from which the default chunk size is worked out.
+        """
+        tasks = ((path, self.atftype) for path in paths)
+        if not self.workers or self.workers == 1:
+            for task in tasks:
+                yield parse_file(task)
+            return
+        chunksize = self.chunksize
+        if not chunksize:
+            # The same default as Pool.map
+            if count is None:
+                count = len(paths)
+            chunksize, extra = divmod(count, self.workers * 4)
+            if extra or not chunksize:
+                chunksize += 1
+        # With fewer files ahead than a chunk per worker, each chunk would
+        # be waited on before the next was sent and only one worker used
+        prefetch = max(self.prefetch or 2 * self.workers * chunksize,
+                       self.workers * chunksize)
+        chunks = iter(lambda: list(islice(tasks, chunksize)), [])
+        first = next(chunks, None)
+        if first is None:
+            return
+        pending = deque()
+        pool = Pool(self.workers)
+        try:
+            for chunk in chain([first], chunks):
+                pending.append(pool.apply_async(parse_files, (chunk,)))
+                while pending and len(pending) * chunksize > prefetch:
+                    for result in pending.popleft().get():
+                        yield result
+            while pending:
+                for result in pending.popleft().get():
+                    yield result
+        finally:
+            if pending and _pyversion() == 3:
+                # Abandoned part way through, drop the outstanding work
+                pool.terminate()
+            else:
+                # On Python 2 terminating a pool can deadlock its task
+                # handler, so the workers finish the chunks they were sent
+                pool.close()
+            pool.join()
+
+
+def report(path, result):
+    print("Parsing file", path, "... ", end="")
+    if isinstance(result, AtfFile):
+        print("OK")
+    else:
+        print("Failed with message: '{}'".format(result))
 
 
 if __name__ == '__main__':
     try:
-        corpus = Corpus(source=sys.argv[1], atftype=sys.argv[2])
+        workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        corpus = Corpus(source=sys.argv[1], atftype=sys.argv[2],
+                        workers=workers, lazy=True)
+        for path, result in corpus:
+            report(path, result)
         print()
         print("Failed with ", corpus.failures, " out of ",
               corpus.failures + corpus.successes, "(",
@@ -61,4 +243,5 @@ if __name__ == '__main__':
               "%)")
     except IndexError:
         print("Input both atffile type and file source like 'python  -m "
-              "pyoracc.model.corpus cdli ./pyoracc/test/data'")
+              "pyoracc.model.corpus cdli ./pyoracc/test/data', optionally "
+              "followed by the number of worker processes")
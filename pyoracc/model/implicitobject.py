@@ -0,0 +1,30 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+from .oraccobject import OraccObject
+
+
+class ImplicitObject(OraccObject):
+    """
+    An object or surface which the ATF leaves out, added by the parser to
+    hold what is written without one: the tablet of a text which starts
+    with a surface, or the obverse of lines which follow an object directly.
+    It is serialized like any other.
+    """
+    __slots__ = ()
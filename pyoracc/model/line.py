@@ -18,47 +18,57 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-from mako.template import Template
+from .serializer import serialize, text_type, write_node, write_to
+from .slots import Slotted, lazy_list
 
 
-class Line(object):
-    template = Template("""\n${label}.\t\\
-${' '.join(words)}\\
-% if references:
-% for reference in references:
-^${reference}^
-% endfor
-% endif
-% if lemmas:
-\n#lem:\\
-${'; '.join(lemmas)}\\
-% endif
-% if notes:
-\n
-% for note in notes:
-${note.serialize()}
-% endfor
-% endif
-% if links:
-\n#link: \\
-% for link in links:
-${link};
-% endfor
-% endif
-""", output_encoding='utf-8')
+class Line(Slotted):
+    # Most lines only ever have words, so the other lists are only created
+    # when something is added to them
+    __slots__ = ('label', 'words', 'translation', '_lemmas', '_witnesses',
+                 '_notes', '_references', '_links')
+    lemmas = lazy_list('_lemmas')
+    witnesses = lazy_list('_witnesses')
+    notes = lazy_list('_notes')
+    references = lazy_list('_references')
+    links = lazy_list('_links')
 
     def __init__(self, label):
         self.label = label
         self.words = []
-        self.lemmas = []
-        self.witnesses = []
         self.translation = None
-        self.notes = []
-        self.references = []
-        self.links = []
 
     def __str__(self):
-        return self.template.render_unicode(**vars(self))
+        return serialize(self)
 
     def serialize(self):
-        return self.template.render_unicode(**vars(self))
+        return serialize(self)
+
+    def write_to(self, fp):
+        write_to(self, fp)
+
+    def _write(self, write):
+        write(u"\n")
+        write(text_type(self.label))
+        write(u".\t")
+        write(text_type(' '.join(self.words)))
+        for reference in Line.references.peek(self):
+            write(u"^")
+            write(text_type(reference))
+            write(u"^\n")
+        lemmas = Line.lemmas.peek(self)
+        if lemmas:
+            write(u"\n#lem:")
+            write(text_type('; '.join(lemmas)))
+        notes = Line.notes.peek(self)
+        if notes:
+            write(u"\n\n")
+            for note in notes:
+                write_node(note, write)
+                write(u"\n")
+        links = Line.links.peek(self)
+        if links:
+            write(u"\n#link: ")
+            for link in links:
+                write(text_type(link))
+                write(u";\n")
@@ -18,7 +18,12 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-class Link(object):
+from .slots import Slotted
+
+
+class Link(Slotted):
+    __slots__ = ('label', 'code', 'description')
+
     def __init__(self, label=None, code=None, description=None):
         self.label = label
         self.code = code
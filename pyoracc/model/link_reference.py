@@ -18,10 +18,15 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-class LinkReference(object):
+from .slots import Slotted, lazy_list
+
+
+class LinkReference(Slotted):
+    __slots__ = ('label', '_rangelabel', 'plus', 'operator', 'target')
+    rangelabel = lazy_list('_rangelabel')
+
     def __init__(self, operator, target):
         self.label = []
-        self.rangelabel = []
         self.plus = False
         self.operator = operator
         self.target = target
@@ -18,6 +18,11 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-class Milestone(object):
+from .slots import Slotted
+
+
+class Milestone(Slotted):
+    __slots__ = ('content',)
+
     def __init__(self, content=""):
         self.content = content
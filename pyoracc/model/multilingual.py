@@ -18,6 +18,11 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-class Multilingual(object):
+from .slots import Slotted
+
+
+class Multilingual(Slotted):
+    __slots__ = ('lines',)
+
     def __init__(self):
         self.lines = {}
@@ -18,22 +18,33 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-from mako.template import Template
+from .serializer import serialize, text_type, write_to
+from .slots import Slotted, lazy_list
 
 
-class Note(object):
-    template = Template("""\\
-% if references:
-% for reference in references:
-@note ^${reference}^ ${content}
-% endfor
-% else:
-#note: ${content}
-% endif""")
+class Note(Slotted):
+    __slots__ = ('content', '_references')
+    references = lazy_list('_references')
 
     def __init__(self, content=""):
         self.content = content
-        self.references = []
 
     def serialize(self):
-        return self.template.render_unicode(**vars(self))
+        return serialize(self)
+
+    def write_to(self, fp):
+        write_to(self, fp)
+
+    def _write(self, write):
+        references = Note.references.peek(self)
+        if references:
+            for reference in references:
+                write(u"@note ^")
+                write(text_type(reference))
+                write(u"^ ")
+                write(text_type(self.content))
+                write(u"\n")
+        else:
+            write(u"#note: ")
+            write(text_type(self.content))
+            write(u"\n")
@@ -22,6 +22,8 @@ from .oraccobject import OraccObject
 
 
 class OraccNamedObject(OraccObject):
+    __slots__ = ('name',)
+
     def __init__(self, objecttype, name):
         super(OraccNamedObject, self).__init__(objecttype)
         self.name = name
@@ -18,15 +18,14 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-from mako.template import Template
+from .serializer import serialize, text_type, write_node, write_to
+from .slots import Slotted
 
 
-class OraccObject(object):
+class OraccObject(Slotted):
 
-    template = Template(r"""@${objecttype}
-% for child in children:
-${child.serialize()}
-% endfor""", output_encoding='utf-8')
+    __slots__ = ('objecttype', 'children', 'query', 'broken', 'remarkable',
+                 'collated')
 
     def __init__(self, objecttype):
         self.objecttype = objecttype
@@ -37,7 +36,18 @@ ${child.serialize()}
         self.collated = False
 
     def __str__(self):
-        return OraccObject.template.render_unicode(**vars(self))
+        return serialize(self)
 
     def serialize(self):
-        return OraccObject.template.render_unicode(**vars(self))
+        return serialize(self)
+
+    def write_to(self, fp):
+        write_to(self, fp)
+
+    def _write(self, write):
+        write(u"@")
+        write(text_type(self.objecttype))
+        write(u"\n")
+        for child in self.children:
+            write_node(child, write)
+            write(u"\n")
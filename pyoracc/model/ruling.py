@@ -18,11 +18,13 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-from mako.template import Template
+from .serializer import serialize, text_type, write_to
+from .slots import Slotted
 
 
-class Ruling(object):
-    template = Template("""\n$ ${type} ruling""")
+class Ruling(Slotted):
+    __slots__ = ('count', 'type', 'query', 'broken', 'remarkable',
+                 'collated')
 
     def __init__(self, count):
         self.count = count
@@ -33,10 +35,18 @@ class Ruling(object):
         self.collated = False
 
     def __str__(self):
-        return self.template.render_unicode(**vars(self))
+        return serialize(self)
 
     def serialize(self):
-        return self.template.render_unicode(**vars(self))
+        return serialize(self)
+
+    def write_to(self, fp):
+        write_to(self, fp)
+
+    def _write(self, write):
+        write(u"\n$ ")
+        write(text_type(self.type))
+        write(u" ruling")
 
     def getRulingType(self):
         typeArr = ["single", "double", "triple"]
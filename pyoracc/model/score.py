@@ -19,9 +19,12 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 
 
 from mako.template import Template
+from .slots import Slotted
 
 
-class Score(object):
+class Score(Slotted):
+    __slots__ = ('ttype', 'mode', 'word')
+
     def __init__(self, ttype, mode, word=False):
         self.ttype = ttype
         self.mode = mode
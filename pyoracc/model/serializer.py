@@ -0,0 +1,64 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+# The parse tree is serialized in a single pass: every node has a
+# _write(write) method which hands its ATF, piece by piece, to write (for
+# instance list.append or a file's write method) and writes its children
+# the same way. serialize() collects the pieces into one string, write_to()
+# streams them to a file so nothing larger than a piece is ever built.
+
+from pyoracc import _pyversion
+
+if _pyversion() == 2:
+    text_type = unicode  # noqa: F821
+else:
+    text_type = str
+
+
+def write_node(node, write):
+    """
+    Write the ATF for node with write. Nodes without a _write method are
+    written through their serialize method, and nodes with neither raise
+    AttributeError.
+    """
+    try:
+        node_write = node._write
+    except AttributeError:
+        write(text_type(node.serialize()))
+    else:
+        node_write(write)
+
+
+def serialize(node):
+    """
+    Return the ATF for node as a unicode string.
+    """
+    pieces = []
+    write_node(node, pieces.append)
+    return u''.join(pieces)
+
+
+def write_to(node, fp):
+    """
+    Write the ATF for node to fp, a file-like object open for writing
+    unicode text, as it is produced. If a node further down cannot be
+    serialized, the ATF before it has already been written when
+    AttributeError is raised.
+    """
+    write_node(node, fp.write)
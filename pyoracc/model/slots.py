@@ -0,0 +1,81 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+class lazy_list(object):
+    """
+    A list attribute which is only created the first time it is used. The
+    list is kept in the slot named by slot, e.g. "_notes" for notes.
+    """
+
+    def __init__(self, slot):
+        self.slot = slot
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            value = []
+            setattr(obj, self.slot, value)
+            return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, value)
+
+    def peek(self, obj):
+        """
+        Return the list if it has been created, or an empty tuple, without
+        creating it.
+        """
+        return getattr(obj, self.slot, ())
+
+
+class Slotted(object):
+    """
+    Base class for the parse tree nodes, which keep their attributes in
+    __slots__ rather than a per instance __dict__.
+    """
+    __slots__ = ()
+
+    def __getstate__(self):
+        return dict((slot, getattr(self, slot))
+                    for slot in _all_slots(type(self))
+                    if hasattr(self, slot))
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+
+_slots = {}
+
+
+def _all_slots(cls):
+    """
+    Return the names of the slots of cls and its bases.
+    """
+    try:
+        return _slots[cls]
+    except KeyError:
+        slots = [slot for klass in reversed(cls.__mro__)
+                 for slot in klass.__dict__.get('__slots__', ())]
+        _slots[cls] = slots
+        return slots
@@ -18,26 +18,12 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-from mako.template import Template
-
-
-class State(object):
-    template = Template("""$ \\
-% if scope:
-${scope} \\
-% endif
-% if state:
-${state}\\
-% elif scope:
-${scope}\\
-% elif extent:
-${extent}\\
-% elif qualification:
-${qualification}\\
-% elif loose:
-${loose}\\
-% endif
-""")
+from .serializer import serialize, text_type, write_to
+from .slots import Slotted
+
+
+class State(Slotted):
+    __slots__ = ('state', 'scope', 'extent', 'qualification', 'loose')
 
     def __init__(self, state=None, scope=None, extent=None,
                  qualification=None, loose=None):
@@ -48,7 +34,23 @@ ${loose}\\
         self.loose = loose
 
     def __str__(self):
-        return self.template.render_unicode(**vars(self))
+        return serialize(self)
 
     def serialize(self):
-        return self.template.render_unicode(**vars(self))
+        return serialize(self)
+
+    def write_to(self, fp):
+        write_to(self, fp)
+
+    def _write(self, write):
+        write(u"$ ")
+        if self.scope:
+            write(text_type(self.scope))
+            write(u" ")
+        # The first of these which is set describes the state; note that
+        # a scope without a state is written twice
+        for value in (self.state, self.scope, self.extent,
+                      self.qualification, self.loose):
+            if value:
+                write(text_type(value))
+                break
@@ -18,33 +18,68 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-from mako.template import Template
 from .oraccobject import OraccObject
+from .serializer import serialize, text_type, write_node, write_to
+from .slots import Slotted, lazy_list
 
 
-class Text(object):
-    template = Template("""&${code} = ${description}
-#project: ${project}
-#atf: lang ${language}
-% for child in children:
-${child.serialize()}
-% endfor""")
+class Text(Slotted):
+    __slots__ = ('children', 'composite', '_links', 'score', 'code',
+                 'description', 'project', 'language', 'version',
+                 '_scanned', '_last_object')
+    links = lazy_list('_links')
 
     def __init__(self):
         self.children = []
         self.composite = False
-        self.links = []
         self.score = None
         self.code = None
         self.description = None
         self.project = None
         self.language = None
+        self.version = None
+        self._scanned = (None, 0)
+        self._last_object = None
 
     def __str__(self):
-        return Text.template.render_unicode(**vars(self))
+        return serialize(self)
 
     def serialize(self):
-        return Text.template.render_unicode(**vars(self))
+        return serialize(self)
+
+    def write_to(self, fp):
+        write_to(self, fp)
+
+    def _write(self, write):
+        write(u"&")
+        write(text_type(self.code))
+        write(u" = ")
+        write(text_type(self.description))
+        write(u"\n#project: ")
+        write(text_type(self.project))
+        write(u"\n#atf: lang ")
+        write(text_type(self.language))
+        write(u"\n")
+        for child in self.children:
+            write_node(child, write)
+            write(u"\n")
 
     def objects(self):
         return [x for x in self.children if isinstance(x, OraccObject)]
+
+    def last_object(self):
+        """
+        Return the last object among the children, or None if there is none.
+        Only the children appended since the previous call are looked at,
+        so finding the object while the text is built up is constant time.
+        """
+        children, scanned = self._scanned
+        if children is not self.children or scanned > len(children):
+            # The children were replaced or shortened, start over
+            children, scanned = self.children, 0
+            self._last_object = None
+        for child in children[scanned:]:
+            if isinstance(child, OraccObject):
+                self._last_object = child
+        self._scanned = (children, len(children))
+        return self._last_object
@@ -18,24 +18,31 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
-from mako.template import Template
+from .serializer import serialize, write_node, write_to
+from .slots import Slotted
 
 
-class Translation(object):
+class Translation(Slotted):
     # TODO: the type of translation (parallel, labelled,  is going to be
     # recorded as text metadata (like the atf protocols, etc), as it's a
     # property of the textual representation and not the object itself. Left
     # "parallel" hardcoded by now.
-    template = Template("""@translation parallel en project
-% for child in children:
-${child.serialize()}
-% endfor""")
+    __slots__ = ('children',)
 
     def __init__(self):
         self.children = []
 
     def __str__(self):
-        return self.template.render_unicode(**vars(self))
+        return serialize(self)
 
     def serialize(self):
-        return self.template.render_unicode(**vars(self))
+        return serialize(self)
+
+    def write_to(self, fp):
+        write_to(self, fp)
+
+    def _write(self, write):
+        write(u"@translation parallel en project\n")
+        for child in self.children:
+            write_node(child, write)
+            write(u"\n")
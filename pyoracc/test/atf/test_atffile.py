@@ -17,8 +17,12 @@ You should have received a copy of the GNU General Public License
 along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
+import logging
+import threading
 
-from pyoracc.atf.common.atffile import AtfFile
+import pytest
+
+from pyoracc.atf.common.atffile import AtfFile, get_lexer_parser
 from ..fixtures import anzu, belsunu, sample_file
 
 
@@ -88,36 +92,161 @@ texts = [
     ]
 
 
-def consider_composite(name, code):
+@pytest.mark.parametrize('name,code,description', texts)
+def test_texts(name, code, description):
+    """"
+    Go through list of selected filenames and check parser deals non-composite
+    files: CDLI ID and text description coincide
+    """
+    afile = AtfFile(sample_file(name))
+    assert afile.text.code == code
+    assert afile.text.description == description
+
+
+@pytest.mark.parametrize('name,code', composites)
+def test_composites(name, code):
     """
-    Parses ATF and checks CDLI ID coincides
+    Go through list of selected composites and check parser deals with
+    composite files correctly: CDLI ID coincides
     """
     afile = AtfFile(sample_file(name))
     assert afile.text.texts[0].code == code
 
 
-def consider_file(name, code, description):
+@pytest.mark.parametrize('name', ['bb_2_7', 'bb_2_61', '3-ob-ura2-q-l-t'])
+def test_line_engine(name):
     """
-    Parses ATF and checks CDLI ID and text description coincide
+    Parse with the line engine and check the text and its errors are those
+    parsed with PLY alone
     """
-    afile = AtfFile(sample_file(name))
-    assert afile.text.code == code
-    assert afile.text.description == description
+    ply = AtfFile(sample_file(name), skip=True)
+    line = AtfFile(sample_file(name), skip=True, engine='line')
+    assert line.serialize() == ply.serialize()
+    assert line.errors_lex == ply.errors_lex
+    assert line.errors_yacc == ply.errors_yacc
 
 
-def test_texts():
-    """"
-    Go through list of selected filenames and check parser deals non-composite
-    files.
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        AtfFile(belsunu(), engine='regex')
+
+
+def test_reused_parser_is_reset():
+    """
+    Parse several texts in a row with the cached lexer and parser and check
+    that errors and line numbers do not leak from one text to the next
+    """
+    bad = AtfFile(u"&X001001 = JCS 48, 089\n@tablet\n@obverse\n1. a\n" +
+                  u"2. b\n$ single ruling ruling\n", skip=True)
+    assert len(bad.errors_yacc) == 1
+    assert bad.errors_yacc[0][1] == 6
+    good = AtfFile(belsunu(), skip=True)
+    assert good.errors_lex == []
+    assert good.errors_yacc == []
+    assert good.text.code == "X001001"
+    assert len(bad.errors_yacc) == 1
+    again = AtfFile(u"&X001001 = JCS 48, 089\n@tablet\n@obverse\n1. a\n" +
+                    u"2. b\n$ single ruling ruling\n", skip=True)
+    assert again.errors_yacc == bad.errors_yacc
+
+
+def test_reused_parser_after_failure():
+    """
+    A text that raises must not leave the cached lexer in a stale state
     """
-    for text in texts:
-        yield consider_file, text[0], text[1], text[2]
+    try:
+        AtfFile(u"&X001001 = JCS 48, 089\n#lem: a; b\n@tablet\n% x\n")
+    except SyntaxError:
+        pass
+    afile = AtfFile(belsunu())
+    assert afile.text.code == "X001001"
 
 
-def test_composites():
+def test_cdli_structure_after_failure(capsys):
     """
-    Go through list of selected composites and check parser deals with
-    composite files correctly
+    The surfaces of a CDLI text which failed to parse must not be checked
+    as part of the next text
+    """
+    with pytest.raises(SyntaxError):
+        AtfFile(u"&P000002 = X 2\n@prism\n@obverse\n1. a\n% x\n", 'cdli')
+    capsys.readouterr()
+    AtfFile(u"&P000003 = X 3\n@tablet\n@obverse\n1. a\n", 'cdli')
+    assert "Warning" not in capsys.readouterr()[0]
+
+
+def test_cdli_warnings(capsys):
+    """
+    CDLI warnings are kept on the AtfFile rather than printed
+    """
+    afile = AtfFile(u"&P000001 = X 1\n@prism\n@obverse\n1. a\n", 'cdli')
+    assert capsys.readouterr()[0] == ""
+    assert [warning.code for warning in afile.warnings] == [
+        'pnumber-replaced', 'surface-specific']
+    assert afile.warnings[0].message == \
+        "Replace Old Pnumber : P000001 with New Pnumber : P464205"
+    assert AtfFile(belsunu()).warnings == []
+
+
+def test_threads():
     """
-    for composite in composites:
-        yield consider_composite, composite[0], composite[1]
+    Texts parsed in several threads at once give the same results as
+    parsed one after the other, each thread with its own lexer and parser
+    """
+    texts = [(belsunu(), 'oracc'),
+             (u"&X001001 = JCS 48, 089\n@tablet\n@obverse\n1. a\n" +
+              u"2. b\n$ single ruling ruling\n", 'oracc'),
+             (u"&P000001 = X 1\n@prism\n@obverse\n1. a\n", 'cdli')]
+
+    def check(text, atftype):
+        afile = AtfFile(text, atftype, skip=True)
+        return (getattr(afile.text, 'code', None), afile.errors_lex,
+                afile.errors_yacc, get_lexer_parser(atftype, skip=True))
+
+    expected = [check(text, atftype)[:3] for text, atftype in texts]
+    results = {}
+
+    def worker(index):
+        results[index] = [check(text, atftype) for _ in range(5)
+                          for text, atftype in texts]
+
+    threads = [threading.Thread(target=worker, args=(index,))
+               for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pairs = set()
+    for index in range(4):
+        assert [result[:3] for result in results[index]] == expected * 5
+        pairs.update(id(result[3][1]) for result in results[index])
+    assert len(pairs) == 4 * len(set(atftype for _, atftype in texts))
+
+
+def test_no_log_without_debug(tmpdir):
+    """
+    Parsing without debug must not write a log file or touch the root logger
+    """
+    handlers = list(logging.getLogger().handlers)
+    with tmpdir.as_cwd():
+        AtfFile(belsunu())
+    assert not tmpdir.join("parselog.txt").check()
+    assert logging.getLogger().handlers == handlers
+
+
+def test_debug_log():
+    """
+    With debug, PLY output goes to the logger given
+    """
+    records = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    log = logging.getLogger("pyoracc.test.debug")
+    log.setLevel(logging.DEBUG)
+    log.propagate = False
+    log.addHandler(ListHandler())
+    afile = AtfFile(belsunu(), debug=True, log=log)
+    assert afile.text.code == "X001001"
+    assert records
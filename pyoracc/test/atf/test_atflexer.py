@@ -203,7 +203,8 @@ class TestLexer(TestCase):
     def test_text_linenumber(self):
         self.compare_tokens(
             "1.    [MU] 1.03-KAM {iti}AB GE₆ U₄ 2-KAM",
-            ["LINELABEL"] + ['ID'] * 6
+            ["LINELABEL", "WORDS"],
+            ["1", ["[MU]", "1.03-KAM", "{iti}AB", "GE₆", "U₄", "2-KAM"]]
         )
 
     def test_lemmatize(self):
@@ -251,9 +252,9 @@ class TestLexer(TestCase):
             "@translation parallel en project\n" +
             "1.    Year 63, Ṭebetu (Month X), night of day 2:^1^",
             ["TRANSLATION", "PARALLEL", "ID", "PROJECT", "NEWLINE",
-             "LINELABEL", "ID", "HAT", "ID", "HAT"],
+             "LINELABEL", "WORDS", "HAT", "ID", "HAT"],
             [None, "parallel", "en", "project", None,
-             "1", "Year 63, Ṭebetu (Month X), night of day 2:",
+             "1", ["Year 63, Ṭebetu (Month X), night of day 2:"],
              None, '1', None]
         )
 
@@ -263,9 +264,9 @@ class TestLexer(TestCase):
             "1.    Year 63, Ṭebetu (Month X)\n" +
             " , night of day 2\n",
             ["TRANSLATION", "PARALLEL", "ID", "PROJECT", "NEWLINE",
-             "LINELABEL", "ID", "NEWLINE"],
+             "LINELABEL", "WORDS", "NEWLINE"],
             [None, "parallel", "en", "project", None,
-             "1", "Year 63, Ṭebetu (Month X) , night of day 2", None]
+             "1", ["Year 63, Ṭebetu (Month X) , night of day 2"], None]
         )
 
     def test_translation_labeled_text(self):
@@ -504,7 +505,7 @@ class TestLexer(TestCase):
             "1'. ⸢x⸣\n" +
             "#tr: English\n",
             ["TABLET", "NEWLINE",
-             "LINELABEL", "ID", "NEWLINE",
+             "LINELABEL", "WORDS", "NEWLINE",
              "TR", "ID", "NEWLINE"])
 
     def test_multilineinterlinear_translation(self):
@@ -514,7 +515,7 @@ class TestLexer(TestCase):
             "#tr: English\n" +
             " on multiple lines\n",
             ["TABLET", "NEWLINE",
-             "LINELABEL", "ID", "NEWLINE",
+             "LINELABEL", "WORDS", "NEWLINE",
              "TR", "ID", "NEWLINE"])
 
     def test_note_internalflag(self):
@@ -559,7 +560,7 @@ class TestLexer(TestCase):
             "3.    U₄!-BI? 20* [(ina)] 9.30 ina(DIŠ) MAŠ₂!(BAR)\n" +
             "#note: Note to line.\n",
             ["TABLET", "NEWLINE", "OBVERSE", "NEWLINE",
-             "LINELABEL"] + ["ID"] * 6 + ["NEWLINE", "NOTE", "ID", "NEWLINE"]
+             "LINELABEL", "WORDS", "NEWLINE", "NOTE", "ID", "NEWLINE"]
         )
 
     def test_hash_note_UPPERCASE(self):
@@ -571,7 +572,7 @@ class TestLexer(TestCase):
             "3.    U₄!-BI? 20* [(ina)] 9.30 ina(DIŠ) MAŠ₂!(BAR)\n" +
             "#NOTE: Note to line.\n",
             ["TABLET", "NEWLINE", "OBVERSE", "NEWLINE",
-             "LINELABEL"] + ["ID"] * 6 + ["NEWLINE", "NOTE", "ID", "NEWLINE"]
+             "LINELABEL", "WORDS", "NEWLINE", "NOTE", "ID", "NEWLINE"]
         )
 
     def test_open_text_with_dots(self):
@@ -665,14 +666,15 @@ class TestLexer(TestCase):
             "ūm[day]N; n\n",
             ['TABLET', 'NEWLINE',
              "OBVERSE", 'NEWLINE',
-             'LINELABEL'] + ['ID'] * 6 + ['NEWLINE', 'LEM'] +
+             'LINELABEL', 'WORDS', 'NEWLINE', 'LEM'] +
             ['ID', 'SEMICOLON'] * 5 + ['ID', "NEWLINE"]
         )
 
     def test_dot_in_linelabel(self):
         self.compare_tokens(
             "1.1.    [MU]\n",
-            ['LINELABEL', 'ID', 'NEWLINE']
+            ['LINELABEL', 'WORDS', 'NEWLINE'],
+            ['1.1', ['[MU]']]
         )
 
     def test_score_lines(self):
@@ -687,11 +689,11 @@ class TestLexer(TestCase):
             "#lem: +hašhūru[apple (tree)]N$hašhūr; api[reed-bed]N;" +
             " imhur-līm['heals-a-thousand'-plant]N\n\n",
             ['SCORE', 'ID', 'ID', "NEWLINE"] +
-            ['LINELABEL'] + ['ID'] * 5 + ['NEWLINE'] +
+            ['LINELABEL', 'WORDS', 'NEWLINE'] +
             ['LEM', 'ID', 'SEMICOLON', 'ID', 'NEWLINE'] +
-            ['SCORELABEL'] + ['ID'] * 7 + ['NEWLINE'] +
+            ['SCORELABEL', 'WORDS', 'NEWLINE'] +
             ['LEM'] + ['ID', 'SEMICOLON'] * 5 + ['ID', 'NEWLINE'] +
-            ['SCORELABEL'] + ['ID'] * 5 + ['NEWLINE'] +
+            ['SCORELABEL', 'WORDS', 'NEWLINE'] +
             ['LEM'] + ['ID', 'SEMICOLON'] * 2 + ['ID', 'NEWLINE']
         )
 
@@ -707,10 +709,10 @@ class TestLexer(TestCase):
             ["AMPERSAND", "ID", "EQUALS", "ID", "NEWLINE"] +
             ['COMPOSITE', 'NEWLINE'] +
             ["PROJECT", "ID", "NEWLINE"] +
-            ["LINELABEL"] + ['ID'] * 6 + ['NEWLINE'] +
+            ["LINELABEL", "WORDS", 'NEWLINE'] +
             ["AMPERSAND", "ID", "EQUALS", "ID", "NEWLINE"] +
             ["PROJECT", "ID", "NEWLINE"] +
-            ["LINELABEL"] + ['ID'] * 4 + ["NEWLINE"]
+            ["LINELABEL", "WORDS", "NEWLINE"]
         )
 
     def test_translated_composite(self):
@@ -727,12 +729,12 @@ class TestLexer(TestCase):
             ["AMPERSAND", "ID", "EQUALS", "ID", "NEWLINE"] +
             ['COMPOSITE', 'NEWLINE'] +
             ["PROJECT", "ID", "NEWLINE"] +
-            ["LINELABEL"] + ['ID'] * 6 + ['NEWLINE'] +
+            ["LINELABEL", "WORDS", 'NEWLINE'] +
             ["TRANSLATION", "LABELED", "ID", "PROJECT", "NEWLINE"] +
             ["OPENR", "ID", "CLOSER", "ID", "NEWLINE"] +
             ["AMPERSAND", "ID", "EQUALS", "ID", "NEWLINE"] +
             ["PROJECT", "ID", "NEWLINE"] +
-            ["LINELABEL"] + ['ID'] * 4 + ["NEWLINE"]
+            ["LINELABEL", "WORDS", "NEWLINE"]
         )
 
     def test_equalbrace(self):
@@ -743,8 +745,8 @@ class TestLexer(TestCase):
             "={    ur-hu\n",
             ['TABLET', "NEWLINE"] +
             ["REVERSE", "NEWLINE"] +
-            ["LINELABEL"] + ['ID'] * 2 + ["NEWLINE"] +
-            ["EQUALBRACE", "ID", "NEWLINE"]
+            ["LINELABEL", "WORDS", "NEWLINE"] +
+            ["EQUALBRACE", "WORDS", "NEWLINE"]
         )
 
     def test_multilingual_interlinear(self):
@@ -759,9 +761,9 @@ class TestLexer(TestCase):
             "|| A o ii 15\n",
             ['TABLET', "NEWLINE"] +
             ["OBVERSE", "NEWLINE"] +
-            ["LINELABEL"] + ['ID'] * 2 + ["NEWLINE"] +
+            ["LINELABEL", "WORDS", "NEWLINE"] +
             ["LEM"] + ["ID", "SEMICOLON"] + ["ID"] + ["NEWLINE"] +
-            ["MULTILINGUAL", "ID"] + ["ID"] * 3 + ["NEWLINE"] +
+            ["MULTILINGUAL", "WORDS", "NEWLINE"] +
             ["LEM"] + ["ID", "SEMICOLON"] * 2 + ["ID"] + ["NEWLINE"] +
             ["COMMENT", "ID", "NEWLINE"] +
             ["PARBAR", "ID", "ID", "ID", "ID", "NEWLINE"]
@@ -859,9 +861,22 @@ class TestLexer(TestCase):
             "@translation parallel en project\n" +
             "1. 'What is going on?', said the King!\n",
             ["TRANSLATION", "PARALLEL", "ID", "PROJECT", "NEWLINE"] +
-            ["LINELABEL", "ID", "NEWLINE"],
+            ["LINELABEL", "WORDS", "NEWLINE"],
             [None, None, "en", None, None] +
-            ["1", "'What is going on?', said the King!", None]
+            ["1", ["'What is going on?', said the King!"], None]
+        )
+
+    def test_translation_text_after_reference(self):
+        self.compare_tokens(
+            "@translation parallel en project\n" +
+            "1. To Marduk ^1^ lord\n" +
+            "^1^ a note\n",
+            ["TRANSLATION", "PARALLEL", "ID", "PROJECT", "NEWLINE"] +
+            ["LINELABEL", "WORDS", "HAT", "ID", "HAT", "WORDS", "NEWLINE"] +
+            ["HAT", "ID", "HAT", "ID", "NEWLINE"],
+            [None, None, "en", None, None] +
+            ["1", ["To Marduk"], None, "1", None, ["lord"], None] +
+            [None, "1", None, "a note", None]
         )
 
     def test_translation_note(self):
@@ -905,7 +920,7 @@ class TestLexer(TestCase):
             ["TABLET", "NEWLINE",
              "OBVERSE", "NEWLINE",
              "M", "EQUALS", "ID", "NEWLINE",
-             "LINELABEL", "ID", "NEWLINE"]
+             "LINELABEL", "WORDS", "NEWLINE"]
         )
 
     def test_include(self):
@@ -933,8 +948,8 @@ class TestLexer(TestCase):
             "# ES mu-lu = lu₂, ša₃-ab = šag\n" +
             "	\n" +
             "7. keš₂-da",
-            ["COMMENT", "ID", "NEWLINE", "LINELABEL", "ID"],
-            ["#", "ES mu-lu = lu₂, ša₃-ab = šag", "\n\t\n", '7', "keš₂-da"])
+            ["COMMENT", "ID", "NEWLINE", "LINELABEL", "WORDS"],
+            ["#", "ES mu-lu = lu₂, ša₃-ab = šag", "\n\t\n", '7', ["keš₂-da"]])
 
     def test_invalid_at_raises_syntax_error(self):
         string = u"@obversel\n"
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+
+import pytest
+
+from pyoracc.atf.common.atflex import AtfLexer
+from pyoracc.atf.common.atflinelex import AtfLineLexer
+from . import test_atflexer
+from ..fixtures import sample_corpus, sample_file
+
+
+def lex(content, engine, skip=False):
+    """
+    Return the tokens of content as tuples, and the lexer errors, as lexed
+    by engine.
+    """
+    atflexer = AtfLexer(skip=skip)
+    if engine == 'line':
+        lexer = AtfLineLexer(atflexer)
+    else:
+        lexer = atflexer.lexer
+    lexer.input(content)
+    tokens = [(token.type, token.value, token.lineno, token.lexpos)
+              for token in lexer]
+    return tokens, atflexer.errors
+
+
+class TestLineLexer(test_atflexer.TestLexer):
+    """The tests of the ATFLexer, run with the line engine"""
+    def setUp(self):
+        self.lexer = AtfLineLexer(AtfLexer())
+
+    def ensure_raises_and_not(self, string, nwarnings):
+        self.lexer.input(string)
+        with pytest.raises(SyntaxError):
+            for i in self.lexer:
+                pass
+        # If we allow invalid syntax the engines skip the same characters
+        assert lex(string, 'line', skip=True) == lex(string, 'ply', skip=True)
+
+
+@pytest.mark.parametrize('name', sorted(
+    filename[:-len('.atf')] for filename in os.listdir(sample_corpus())
+    if filename.endswith('.atf')))
+def test_sample_corpus(name):
+    """
+    Check that the line engine gives the tokens PLY gives for each file of
+    the sample corpus
+    """
+    content = sample_file(name)
+    assert lex(content, 'line', skip=True) == lex(content, 'ply', skip=True)
+
+
+@pytest.mark.parametrize('content', [
+    u"1. a-na  {d}utu\t\n",
+    u"1. a-na \xa0\n",
+    u"1. a-na\r\n2. szu\n \n",
+    u"#lem: ana[to]PRP;  Szamasz[1]DN \n",
+    u"#LEM: ana[to]PRP\n",
+    u"#lems: ana[to]PRP\n",
+    u"#key: a = b =\n",
+    u"# a comment \n#\n",
+    u"1. a-na",
+])
+def test_edge_cases(content):
+    """
+    Check the line engine against PLY on lines near the edges of what it
+    scans itself
+    """
+    assert lex(content, 'line', skip=True) == lex(content, 'ply', skip=True)
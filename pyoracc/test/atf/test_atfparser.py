@@ -333,6 +333,17 @@ class TestParser(TestCase):
         )
         assert len(art.children[0].children[0].words) == 6
 
+    def test_line_words(self):
+        art = self.try_parse(
+            "@tablet\n" +
+            "@obverse\n" +
+            "1.\ta-na  {d}utu\t^1^ be-li2 \n"
+        )
+        line = art.children[0].children[0]
+        assert line.label == "1"
+        assert line.words == ["a-na", "{d}utu", "^1^", "be-li2"]
+        assert line.references == []
+
     # @skip("No idea what this means")
     def test_line_equalsbrace(self):
         art = self.try_parse(
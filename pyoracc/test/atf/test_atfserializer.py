@@ -20,6 +20,7 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 
 
 import codecs
+import io
 from unittest import TestCase, skip
 import pytest
 
@@ -29,6 +30,11 @@ from pyoracc.test.fixtures import belsunu, output_filepath
 from pyoracc.atf.common.atflex import AtfLexer
 from pyoracc.atf.common.atfyacc import AtfParser
 from pyoracc.model.line import Line
+from pyoracc.model.milestone import Milestone
+from pyoracc.model.note import Note
+from pyoracc.model.oraccobject import OraccObject
+from pyoracc.model.ruling import Ruling
+from pyoracc.model.state import State
 
 
 class TestSerializer(TestCase):
@@ -92,6 +98,18 @@ class TestSerializer(TestCase):
         serialized_2 = self.parse_then_serialize(serialized_1)
         assert serialized_1 == serialized_2
 
+    def test_write_to(self):
+        """
+        Streaming a file gives the same text as serializing it.
+        """
+        atf_file = self.parse(belsunu())
+        stream = io.StringIO()
+        atf_file.write_to(stream)
+        assert stream.getvalue() == atf_file.serialize()
+        stream = io.StringIO()
+        atf_file.text.children[0].write_to(stream)
+        assert stream.getvalue() == atf_file.text.children[0].serialize()
+
     @pytest.mark.xfail
     @staticmethod
     def test_line_word():
@@ -130,6 +148,45 @@ class TestSerializer(TestCase):
                 u'm\u016b\u0161a[at night]AV', u'\u016bm[day]N', u'n']
         assert ulemmas == gold
 
+    @staticmethod
+    def test_line_full():
+        """
+        Serialize a line with words, references, lemmas, notes and links.
+        """
+        line = Line("1")
+        line.words.extend([u"a", u"GE\u2086"])
+        line.references.append("A")
+        line.lemmas = [u"a[x]N", u"n"]
+        line.notes.append(Note("n1"))
+        line.links.append("B")
+        assert line.serialize() == (u"\n1.\ta GE\u2086^A^\n\n#lem:a[x]N; n"
+                                    u"\n\n#note: n1\n\n\n#link: B;\n")
+
+    @staticmethod
+    def test_note_references():
+        note = Note("text")
+        note.references.extend(["1", "2"])
+        assert note.serialize() == u"@note ^1^ text\n@note ^2^ text\n"
+
+    @staticmethod
+    def test_state():
+        assert State("blank", "obverse").serialize() == u"$ obverse blank"
+        assert State(scope="obverse").serialize() == u"$ obverse obverse"
+        assert State(extent="2", loose="x").serialize() == u"$ 2"
+
+    @staticmethod
+    def test_object():
+        obverse = OraccObject("obverse")
+        obverse.children.extend([Line("1"), Ruling(2)])
+        assert obverse.serialize() == u"@obverse\n\n1.\t\n\n$ double ruling\n"
+
+    @staticmethod
+    def test_unserializable_child():
+        obverse = OraccObject("obverse")
+        obverse.children.append(Milestone())
+        with pytest.raises(AttributeError):
+            obverse.serialize()
+
 
 # TODO: Build list of atf files for testing and make a test to go through the
 # list of test and try serializing each of them.
@@ -0,0 +1,83 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+import sys
+
+import pytest
+from ply.lex import NullLogger
+
+from pyoracc.atf.cdli.atfyacc import AtfCDLIParser
+from pyoracc.atf.common import plytables
+from pyoracc.atf.common.atfyacc import AtfParser
+from pyoracc.atf.oracc.atflex import AtfOraccLexer
+from pyoracc.atf.oracc.atfyacc import AtfOraccParser
+from ..fixtures import belsunu
+
+
+def tokens(lexer):
+    lexer.input(belsunu())
+    return [(token.type, token.value) for token in lexer]
+
+
+@pytest.fixture
+def table_package(tmpdir, monkeypatch):
+    package = tmpdir.mkdir("tables")
+    package.join("__init__.py").write("")
+    monkeypatch.syspath_prepend(str(tmpdir))
+    monkeypatch.setattr(AtfOraccLexer, 'lextab', 'tables.lextab')
+    yield str(package)
+    for name in list(sys.modules):
+        if name.split('.')[0] == "tables":
+            del sys.modules[name]
+
+
+def test_parse_tables_per_dialect():
+    assert len(set([AtfParser.tabmodule, AtfOraccParser.tabmodule,
+                    AtfCDLIParser.tabmodule])) == 3
+
+
+def test_lextab_roundtrip(table_package):
+    lexer = AtfOraccLexer(skip=False, debug=0, log=NullLogger())
+    assert plytables.load_lexer(lexer) is None
+    plytables.write_lextab(lexer)
+    assert os.path.exists(os.path.join(
+        table_package, plytables.lextab_name(lexer).split('.')[-1] + ".py"))
+    loaded = plytables.load_lexer(lexer)
+    assert loaded is not None
+    assert tokens(loaded) == tokens(AtfOraccLexer(skip=False, debug=0,
+                                                  log=NullLogger()).lexer)
+
+
+def test_lextab_outdated(table_package, monkeypatch):
+    lexer = AtfOraccLexer(skip=False, debug=0, log=NullLogger())
+    plytables.write_lextab(lexer)
+    # A rule changing after the table was written makes it unusable
+    monkeypatch.setattr(AtfOraccLexer, 't_EQUALS', "=")
+    assert plytables.load_lexer(lexer) is None
+
+
+def test_parser_signature(monkeypatch):
+    signature = plytables.parser_signature(AtfOraccParser)
+    assert signature == plytables.parser_signature(AtfOraccParser)
+    assert signature != plytables.parser_signature(AtfCDLIParser)
+    # It changes with any change to the grammar
+    monkeypatch.setattr(AtfOraccParser, 'precedence',
+                        AtfOraccParser.precedence[1:])
+    assert signature != plytables.parser_signature(AtfOraccParser)
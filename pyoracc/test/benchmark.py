@@ -0,0 +1,312 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+# Timing harness for the ATF lexer, parser, serializer, corpus loader and
+# CDLI surface checks. Run it with
+#
+#     $ python -m pyoracc.test.benchmark [source] [atftype] [repeat]
+#
+# source defaults to the whole corpus when oracc_corpus_path is set and to
+# the bundled sample corpus otherwise, atftype defaults to oracc. The same
+# benchmarks run under pytest with --runbenchmark.
+
+from __future__ import print_function, division
+import codecs
+import gc
+import os
+import sys
+import time
+import types
+from contextlib import contextmanager
+
+from pyoracc.atf.common.atffile import AtfFile, get_lexer_parser
+from pyoracc.atf.common.atflinelex import AtfLineLexer
+from pyoracc.cdlimodel.structure import check_document
+from pyoracc.model.corpus import Corpus
+from pyoracc.test.fixtures import sample_corpus, whole_corpus
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+
+def read_corpus(source):
+    """
+    Return a list of (path, content) pairs for the .atf files under source,
+    in path order.
+    """
+    texts = []
+    for dirpath, _, files in os.walk(source):
+        for name in files:
+            if name.endswith('.atf'):
+                path = os.path.join(dirpath, name)
+                texts.append((path, codecs.open(path,
+                                                encoding='utf-8-sig').read()))
+    return sorted(texts)
+
+
+def corpus_bytes(texts):
+    return sum(len(content.encode('utf-8')) for _, content in texts)
+
+
+def best_time(function, repeat):
+    """
+    Call function repeat times and return its result and the fastest time.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.time()
+        result = function()
+        timings.append(time.time() - start)
+    return result, min(timings)
+
+
+def peak_rss():
+    """
+    Peak resident set size of this process in bytes, or None if unknown.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def tree_size(root):
+    """
+    Return the number of bytes taken by root and everything it refers to,
+    leaving out classes, functions and modules, which are shared.
+    """
+    shared = (type, types.ModuleType, types.FunctionType)
+    seen = set()
+    pending = [root]
+    size = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, shared):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return size
+
+
+@contextmanager
+def quiet():
+    """
+    Silence the per file progress output of the corpus loader.
+    """
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        try:
+            yield
+        finally:
+            sys.stdout = stdout
+
+
+def lex_corpus(texts, atftype='oracc', engine='ply'):
+    """
+    Tokenize every text with the given lexer engine and return the number
+    of tokens produced.
+    """
+    count = 0
+    for _, content in texts:
+        atflexer, _ = get_lexer_parser(atftype, skip=True)
+        if engine == 'line':
+            lexer = AtfLineLexer(atflexer)
+        else:
+            lexer = atflexer.lexer
+        lexer.input(content)
+        for _ in lexer:
+            count += 1
+    return count
+
+
+def parse_corpus(texts, atftype='oracc'):
+    """
+    Parse every text and return the parsed files; texts which fail to
+    parse are left out.
+    """
+    parsed = []
+    for _, content in texts:
+        try:
+            parsed.append(AtfFile(content, atftype))
+        except (SyntaxError, IndexError, AttributeError):
+            pass
+    return parsed
+
+
+def serialize_corpus(parsed):
+    """
+    Serialize every parsed file and return the number of files serialized;
+    files which fail to serialize are left out.
+    """
+    count = 0
+    for atffile in parsed:
+        try:
+            atffile.serialize()
+            count += 1
+        except (AttributeError, TypeError):
+            pass
+    return count
+
+
+def load_corpus(source, atftype='oracc'):
+    with quiet():
+        return Corpus(source=source, atftype=atftype)
+
+
+def rates(seconds, texts, nbytes, **extra):
+    result = {'seconds': seconds,
+              'texts': texts,
+              'texts_per_second': texts / seconds,
+              'bytes_per_second': nbytes / seconds}
+    result.update(extra)
+    return result
+
+
+def benchmark_lexer(texts, atftype='oracc', repeat=3, engine='ply'):
+    tokens, seconds = best_time(lambda: lex_corpus(texts, atftype, engine),
+                                repeat)
+    return rates(seconds, len(texts), corpus_bytes(texts), tokens=tokens,
+                 tokens_per_second=tokens / seconds)
+
+
+def benchmark_parser(texts, atftype='oracc', repeat=3):
+    parsed, seconds = best_time(lambda: parse_corpus(texts, atftype), repeat)
+    return rates(seconds, len(parsed), corpus_bytes(texts),
+                 failures=len(texts) - len(parsed))
+
+
+def benchmark_serializer(texts, atftype='oracc', repeat=3):
+    parsed = parse_corpus(texts, atftype)
+    count, seconds = best_time(lambda: serialize_corpus(parsed), repeat)
+    return rates(seconds, count, corpus_bytes(texts),
+                 failures=len(parsed) - count)
+
+
+def benchmark_corpus(source, texts, atftype='oracc', repeat=1):
+    corpus, seconds = best_time(lambda: load_corpus(source, atftype), repeat)
+    return rates(seconds, corpus.successes, corpus_bytes(texts),
+                 failures=corpus.failures)
+
+
+def benchmark_memory(texts, atftype='oracc'):
+    """
+    Measure the memory held by the parse trees of texts, in total and per
+    line of ATF source.
+    """
+    count, lines, nbytes = 0, 0, 0
+    for _, content in texts:
+        try:
+            atffile = AtfFile(content, atftype)
+        except (SyntaxError, IndexError, AttributeError):
+            continue
+        count += 1
+        lines += content.count('\n') + 1
+        nbytes += tree_size(atffile.text)
+    return {'texts': count, 'lines': lines, 'bytes': nbytes,
+            'bytes_per_line': nbytes / lines}
+
+
+def synthetic_text(objects):
+    """
+    Return an ATF text with the given number of objects, each followed by a
+    comment and a surface, so that every surface is attached to its object
+    at the text level.
+    """
+    return (u"&X000001 = Synthetic\n#project: test\n#atf: lang akk\n" +
+            u"@tablet\n# comment\n@obverse\n1. a\n" * objects)
+
+
+def benchmark_surfaces(objects=4000, repeat=3):
+    content = synthetic_text(objects)
+    _, seconds = best_time(lambda: AtfFile(content), repeat)
+    return {'objects': objects, 'seconds': seconds,
+            'objects_per_second': objects / seconds}
+
+
+def check_structure(parsed):
+    """
+    Check the CDLI surface rules on every parsed file and return the number
+    of warnings.
+    """
+    return sum(len(check_document(atffile.text)) for atffile in parsed)
+
+
+def benchmark_structure(texts, repeat=3):
+    """
+    Time the CDLI surface checks on their own, over texts parsed as CDLI.
+    """
+    parsed = parse_corpus(texts, 'cdli')
+    warnings, seconds = best_time(lambda: check_structure(parsed), repeat)
+    return rates(seconds, len(parsed), corpus_bytes(texts),
+                 warnings=warnings)
+
+
+def run(source=None, atftype='oracc', repeat=3):
+    """
+    Run every benchmark over source and return their results by name.
+    """
+    source = source or whole_corpus() or sample_corpus()
+    texts = read_corpus(source)
+    results = {}
+    results['lexer'] = benchmark_lexer(texts, atftype, repeat)
+    results['line_lexer'] = benchmark_lexer(texts, atftype, repeat, 'line')
+    results['parser'] = benchmark_parser(texts, atftype, repeat)
+    results['serializer'] = benchmark_serializer(texts, atftype, repeat)
+    results['corpus'] = benchmark_corpus(source, texts, atftype)
+    results['memory'] = benchmark_memory(texts, atftype)
+    results['surfaces'] = benchmark_surfaces(repeat=repeat)
+    results['structure'] = benchmark_structure(texts, repeat)
+    results['peak_rss'] = peak_rss()
+    return results
+
+
+def report(results):
+    # bytes/s is always relative to the size of the ATF source
+    line = ("{name:<11} {texts:>6} texts in {seconds:8.3f}s "
+            "{texts_per_second:9.1f} texts/s {bytes_per_second:11.0f} bytes/s")
+    for name in ['lexer', 'line_lexer', 'parser', 'serializer', 'corpus',
+                 'structure']:
+        result = results[name]
+        print(line.format(name=name, **result), end="")
+        if 'tokens_per_second' in result:
+            print(" {0:9.0f} tokens/s".format(result['tokens_per_second']),
+                  end="")
+        if result.get('failures'):
+            print(" ({0} failed)".format(result['failures']), end="")
+        print()
+    print("parse trees {bytes:>11} bytes for {lines} lines, "
+          "{bytes_per_line:.0f} bytes/line".format(**results['memory']))
+    print("surfaces    {objects:>6} objects in {seconds:8.3f}s "
+          "{objects_per_second:9.1f} objects/s".format(**results['surfaces']))
+    if results['peak_rss'] is not None:
+        print("peak RSS    {0:.1f} MB".format(results['peak_rss'] / 2 ** 20))
+
+
+def main(source=None, atftype='oracc', repeat=3):
+    report(run(source, atftype, int(repeat)))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,43 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+from pyoracc.cdlimodel.cdlitext import CDLIText
+
+
+def test_check_pnumber():
+    assert CDLIText().CheckPnumber("P000002")
+    assert not CDLIText().CheckPnumber("P000002a")
+    assert not CDLIText().CheckPnumber("X000002")
+
+
+def test_lookups_are_shared():
+    first = CDLIText()
+    first.CheckPnumber("P000002")
+    second = CDLIText()
+    second.CheckPnumber("P000003")
+    assert first.pList is second.pList
+
+
+def test_check_pmap():
+    assert CDLIText().CheckPMap("P000001") == \
+        ("P464205", True, "Replace Old Pnumber : P000001 with "
+                          "New Pnumber : P464205")
+    assert CDLIText().CheckPMap("P000002") == ("P000002", True, None)
+    assert CDLIText().CheckPMap("P999999999") == ("P999999999", False, None)
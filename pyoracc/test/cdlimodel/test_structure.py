@@ -0,0 +1,80 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+import pytest
+
+from pyoracc.atf.common.atffile import AtfFile
+from pyoracc.cdlimodel.cdliwarning import CDLIWarning
+from pyoracc.cdlimodel.structure import check_document, object_type
+from pyoracc.model.oraccnamedobject import OraccNamedObject
+from pyoracc.model.oraccobject import OraccObject
+
+
+def parse(content):
+    return AtfFile(content, 'cdli').text
+
+
+def test_surface_rules():
+    text = parse(u"&P000002 = X 2\n@prism\n@obverse\n1. a\n@face a\n1. b\n")
+    assert check_document(text) == [
+        CDLIWarning('surface-face', "P000002", 'General',
+                    "Surface Type: face is not supported anymore."),
+        CDLIWarning('surface-specific', "P000002", 'Prism',
+                    "Specific Surface type (ex. @obverse) are not allowed.")]
+    assert str(check_document(text)[1]) == \
+        "P000002: Prism Warning: Specific Surface type (ex. @obverse) are " \
+        "not allowed."
+
+
+@pytest.mark.parametrize('obj,objtype', [
+    (OraccObject("tablet"), None),
+    (OraccObject("prism"), 'Prism'),
+    (OraccObject("sealings"), 'Sealing'),
+    (OraccNamedObject("object", "cylinder seal"), 'Cylinder'),
+    (OraccNamedObject("object", "seal"), 'Seal'),
+    (OraccNamedObject("fragment", "a"), None),
+])
+def test_object_type(obj, objtype):
+    assert object_type(obj) == objtype
+
+
+def test_lines_without_surface():
+    """
+    The obverse the parser adds for lines written without a surface is not
+    a surface of the object as far as the rules go
+    """
+    text = parse(u"&P000002 = X 2\n@prism\n1. a\n2. b\n")
+    assert check_document(text) == []
+
+
+def test_columns():
+    text = parse(u"&P000002 = X 2\n@object composite\n@column 1\n1. a\n")
+    assert [warning.code for warning in check_document(text)] == \
+        ['surface-column']
+
+
+def test_texts_in_document():
+    """
+    Each text's warnings are given with its own P-number
+    """
+    text = parse(u"&P000001 = X 1\n@prism\n@obverse\n1. a\n" +
+                 u"&P000002 = X 2\n@tablet\n@obverse\n1. a\n")
+    assert [(warning.pnumber, warning.category)
+            for warning in check_document(text)] == [("P000001", 'Prism')]
@@ -18,17 +18,17 @@ along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
 '''
 
 
+import os
 import pytest
 
+from ...atf.common.atffile import AtfFile
+from ...model import corpus as corpus_module
 from ...model.corpus import Corpus
 
 from ..fixtures import tiny_corpus, sample_corpus, whole_corpus
 
 
-slow = pytest.mark.skipif(
-    not pytest.config.getoption("--runslow"),
-    reason="need --runslow option to run"
-)
+slow = pytest.mark.slow
 
 
 def test_tiny():
@@ -56,3 +56,154 @@ def test_whole():
     # which is 61 MB and this to large to fit in the git repository
     assert corpus.successes == 6750
     assert corpus.failures == 1479
+
+
+def test_tiny_workers():
+    corpus = Corpus(source=tiny_corpus(), atftype='oracc', workers=2)
+    assert corpus.successes == 1
+    assert corpus.failures == 1
+    # Results come back in path order: bad.atf, then belsunu.atf
+    assert corpus.texts[0] is None
+    assert corpus.texts[1].text.code == "X001001"
+
+
+@slow
+def test_sample_workers():
+    serial = Corpus(source=sample_corpus(), atftype='oracc')
+    corpus = Corpus(source=sample_corpus(), atftype='oracc', workers=2,
+                    chunksize=3)
+    assert corpus.successes == 37
+    assert corpus.failures == 2
+    assert [summary(atffile) for atffile in corpus.texts] == \
+        [summary(atffile) for atffile in serial.texts]
+
+
+def summary(atffile):
+    if atffile is None:
+        return None
+    if hasattr(atffile.text, 'texts'):
+        return [text.code for text in atffile.text.texts]
+    return atffile.text.code
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_tiny_lazy(workers):
+    corpus = Corpus(source=tiny_corpus(), atftype='oracc', lazy=True,
+                    workers=workers, chunksize=1, prefetch=1)
+    assert corpus.successes == 0
+    results = list(corpus)
+    assert [os.path.basename(path) for path, _ in results] == \
+        ["bad.atf", "belsunu.atf"]
+    assert isinstance(results[0][1], SyntaxError)
+    assert isinstance(results[1][1], AtfFile)
+    assert corpus.successes == 1
+    assert corpus.failures == 1
+    assert corpus.texts == []
+
+
+def test_iterate_again():
+    corpus = Corpus(source=tiny_corpus(), atftype='oracc')
+    assert len(list(corpus)) == 2
+    assert corpus.successes == 1
+    assert corpus.failures == 1
+
+
+def test_lazy_stop_early():
+    corpus = Corpus(source=sample_corpus(), atftype='oracc', lazy=True,
+                    workers=2, chunksize=2, prefetch=4)
+    for path, result in corpus:
+        break
+    assert corpus.successes + corpus.failures == 1
+
+
+class RecordingPool(object):
+    """
+    Stands in for a process pool, running each task when its result is
+    asked for and recording how many were sent and not yet asked for.
+    """
+    def __init__(self, workers):
+        self.in_flight = []
+
+    def apply_async(self, func, args):
+        self.in_flight.append(args)
+        pool = self
+
+        class Result(object):
+            def get(self):
+                pool.in_flight.remove(args)
+                return func(*args)
+        return Result()
+
+    def close(self):
+        pass
+
+    terminate = close
+    join = close
+
+
+def test_small_prefetch(monkeypatch):
+    pools = []
+
+    def make_pool(workers):
+        pools.append(RecordingPool(workers))
+        return pools[-1]
+    monkeypatch.setattr(corpus_module, 'Pool', make_pool)
+    corpus = Corpus(source=sample_corpus(), atftype='oracc', lazy=True,
+                    workers=2, chunksize=2, prefetch=1)
+    for path, result in corpus:
+        break
+    # The first chunk was taken with the other chunks for the workers still
+    # being parsed, rather than one chunk at a time
+    assert len(pools[0].in_flight) >= 2
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_tiny_cache(tmpdir, workers):
+    cache = os.path.join(str(tmpdir), "cache.sqlite")
+    first = Corpus(source=tiny_corpus(), atftype='oracc', cache=cache,
+                   workers=workers)
+    assert (first.cache.hits, first.cache.misses) == (0, 2)
+    second = Corpus(source=tiny_corpus(), atftype='oracc', cache=cache,
+                    workers=workers)
+    assert (second.cache.hits, second.cache.misses) == (2, 0)
+    assert second.successes == 1
+    assert second.failures == 1
+    assert second.texts[0] is None
+    assert second.texts[1].serialize() == first.texts[1].serialize()
+
+
+def test_cache_tree_version(tmpdir, monkeypatch):
+    cache = os.path.join(str(tmpdir), "cache.sqlite")
+    Corpus(source=tiny_corpus(), atftype='oracc', cache=cache)
+    # Trees cached before the parser or model changed are not used
+    monkeypatch.setattr(corpus_module, 'TREE_VERSION',
+                        corpus_module.TREE_VERSION + 1)
+    corpus = Corpus(source=tiny_corpus(), atftype='oracc', cache=cache)
+    assert (corpus.cache.hits, corpus.cache.misses) == (0, 2)
+
+
+@pytest.mark.parametrize("workers,looked_up", [(None, 1), (2, 3)])
+def test_cache_lazy(tmpdir, workers, looked_up):
+    cache = os.path.join(str(tmpdir), "cache.sqlite")
+    corpus = Corpus(source=sample_corpus(), atftype='oracc', lazy=True,
+                    cache=cache, workers=workers, chunksize=1, prefetch=2)
+    for path, result in corpus:
+        break
+    # Files are looked up in the cache as they are reached, rather than
+    # all of them before the first result
+    assert corpus.cache.misses == looked_up
+
+
+@slow
+@pytest.mark.parametrize("workers", [None, 2])
+def test_sample_cache_partial(tmpdir, workers):
+    cache = os.path.join(str(tmpdir), "cache.sqlite")
+    serial = Corpus(source=sample_corpus(), atftype='oracc')
+    first = Corpus(source=sample_corpus(), atftype='oracc', lazy=True,
+                   cache=cache)
+    list(first.parse(first.paths()[::2]))
+    corpus = Corpus(source=sample_corpus(), atftype='oracc', cache=cache,
+                    workers=workers, chunksize=3)
+    assert (corpus.cache.hits, corpus.cache.misses) == (20, 19)
+    assert [summary(atffile) for atffile in corpus.texts] == \
+        [summary(atffile) for atffile in serial.texts]
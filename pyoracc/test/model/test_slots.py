@@ -0,0 +1,51 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+import pickle
+
+import pytest
+
+from ...atf.common.atffile import AtfFile
+from ...model.line import Line
+
+from ..fixtures import belsunu
+
+
+def test_no_instance_dict():
+    line = Line("1")
+    assert not hasattr(line, '__dict__')
+    with pytest.raises(AttributeError):
+        line.lemmata = []
+
+
+def test_lazy_lists():
+    line = Line("1")
+    assert Line.notes.peek(line) == ()
+    line.notes.append("note")
+    assert line.notes == ["note"]
+    line.lemmas = ["a[b]N"]
+    assert Line.lemmas.peek(line) == ["a[b]N"]
+
+
+@pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle(protocol):
+    text = AtfFile(belsunu()).text
+    copy = pickle.loads(pickle.dumps(text, protocol))
+    assert copy.serialize() == text.serialize()
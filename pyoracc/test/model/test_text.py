@@ -0,0 +1,48 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+from ...atf.common.atffile import AtfFile
+from ...model.comment import Comment
+from ...model.oraccobject import OraccObject
+from ...model.text import Text
+from ..benchmark import synthetic_text
+
+
+def test_last_object():
+    text = Text()
+    assert text.last_object() is None
+    tablet = OraccObject("tablet")
+    text.children.extend([tablet, Comment("c")])
+    assert text.last_object() is tablet
+    envelope = OraccObject("envelope")
+    text.children.append(envelope)
+    assert text.last_object() is envelope
+    # Replacing the children is noticed too
+    text.children = [tablet]
+    assert text.last_object() is tablet
+    del text.children[:]
+    assert text.last_object() is None
+
+
+def test_surfaces_on_own_object():
+    text = AtfFile(synthetic_text(3)).text
+    assert len(text.objects()) == 3
+    for tablet in text.objects():
+        assert [child.objecttype for child in tablet.children] == ["obverse"]
@@ -0,0 +1,96 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+from __future__ import print_function
+import pytest
+
+from pyoracc.test import benchmark
+from pyoracc.test.fixtures import sample_corpus, whole_corpus
+
+# Run with --runbenchmark, and -s to see the figures. Set oracc_corpus_path
+# to benchmark the whole corpus rather than the bundled sample.
+
+
+@pytest.fixture(scope="module")
+def source():
+    return whole_corpus() or sample_corpus()
+
+
+@pytest.fixture(scope="module")
+def texts(source):
+    return benchmark.read_corpus(source)
+
+
+@pytest.mark.benchmark
+def test_lexer(texts):
+    result = benchmark.benchmark_lexer(texts)
+    print("\nlexer: {tokens_per_second:.0f} tokens/s".format(**result))
+    assert result['tokens'] > 0
+
+
+@pytest.mark.benchmark
+def test_line_lexer(texts):
+    result = benchmark.benchmark_lexer(texts, engine='line')
+    print("\nline lexer: {tokens_per_second:.0f} tokens/s".format(**result))
+    assert result['tokens'] == benchmark.lex_corpus(texts)
+
+
+@pytest.mark.benchmark
+def test_parser(texts):
+    result = benchmark.benchmark_parser(texts)
+    print("\nparser: {texts_per_second:.1f} texts/s, "
+          "{bytes_per_second:.0f} bytes/s".format(**result))
+    assert result['texts'] > 0
+
+
+@pytest.mark.benchmark
+def test_serializer(texts):
+    result = benchmark.benchmark_serializer(texts)
+    print("\nserializer: {texts_per_second:.1f} texts/s".format(**result))
+    assert result['texts'] > 0
+
+
+@pytest.mark.benchmark
+def test_corpus(source, texts):
+    result = benchmark.benchmark_corpus(source, texts)
+    print("\ncorpus: {texts_per_second:.1f} texts/s, "
+          "peak RSS {0} bytes".format(benchmark.peak_rss(), **result))
+    assert result['texts'] > 0
+
+
+@pytest.mark.benchmark
+def test_memory(texts):
+    result = benchmark.benchmark_memory(texts)
+    print("\nparse trees: {bytes_per_line:.0f} bytes/line".format(**result))
+    assert result['bytes'] > 0
+
+
+@pytest.mark.benchmark
+def test_surfaces():
+    result = benchmark.benchmark_surfaces()
+    print("\nsurfaces: {objects_per_second:.1f} objects/s".format(**result))
+    assert result['objects'] > 0
+
+
+@pytest.mark.benchmark
+def test_structure(texts):
+    result = benchmark.benchmark_structure(texts)
+    print("\nstructure: {texts_per_second:.1f} texts/s".format(**result))
+    assert result['texts'] > 0
@@ -0,0 +1,50 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+import os
+
+from pyoracc.tools import resultcache
+from pyoracc.tools.resultcache import ResultCache
+
+
+def test_key():
+    key = ResultCache.key(u"&P000001 = X 1\n", 'oracc', 'check')
+    assert key == ResultCache.key(b"&P000001 = X 1\n", 'oracc', 'check')
+    assert key != ResultCache.key(u"&P000001 = X 1\n", 'cdli', 'check')
+    assert key != ResultCache.key(u"&P000001 = X 1\n", 'oracc', 'parse')
+    assert key != ResultCache.key(u"&P000002 = X 1\n", 'oracc', 'check')
+
+
+def test_version_in_key(monkeypatch):
+    key = ResultCache.key(u"&P000001 = X 1\n", 'oracc', 'check')
+    monkeypatch.setattr(resultcache, '__version__', '0.0.0')
+    assert key != ResultCache.key(u"&P000001 = X 1\n", 'oracc', 'check')
+
+
+def test_persistent(tmpdir):
+    path = os.path.join(str(tmpdir), "cache.sqlite")
+    with ResultCache(path) as cache:
+        assert cache.get("key") is None
+        cache.put("key", ([(u"\u2086", 1, 0)], []))
+        assert "key" in cache
+    with ResultCache(path) as cache:
+        assert cache.get("key") == ([(u"\u2086", 1, 0)], [])
+        assert "other" not in cache
+        assert (cache.hits, cache.misses) == (1, 0)
@@ -0,0 +1,285 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+import codecs
+import json
+import os
+
+from click.testing import CliRunner
+
+from pyoracc.cdlimodel.cdliwarning import CDLIWarning
+from pyoracc.tools.resultcache import ResultCache
+from pyoracc.wrapper import cli
+from pyoracc.atf.common.atffile import grammar_signature
+from pyoracc.wrapper.cli import (check_and_process, check_cached_segments,
+                                 check_kind, main, output_error,
+                                 output_jsonl, worker_pool)
+from pyoracc.wrapper.manifest import Manifest
+from pyoracc.wrapper.segment import Segmentor
+
+bundle = u"""
+&P000001 = X 1
+@tablet
+@obverse
+1. a-na
+
+&P000002 = X 2
+@tablet
+@obverse
+1. a
+"""
+
+broken = u"""&P000003 = X 3
+@tablet
+@obverse
+1. a
+$ single ruling ruling
+"""
+
+
+def write_bundles(tmpdir, count):
+    for index in range(count):
+        path = os.path.join(str(tmpdir), "bundle{0}.atf".format(index))
+        with codecs.open(path, 'w', 'utf-8') as bundle_file:
+            bundle_file.write(bundle)
+    return str(tmpdir)
+
+
+def test_shared_pool(tmpdir):
+    folder = write_bundles(tmpdir, 2)
+    pool = worker_pool('oracc')
+    try:
+        for name in sorted(os.listdir(folder)):
+            assert check_and_process(os.path.join(folder, name), '',
+                                     'oracc', False, pool=pool) == 1
+    finally:
+        pool.close()
+        pool.join()
+
+
+def test_shared_pool_decode_error(tmpdir):
+    folder = write_bundles(tmpdir, 1)
+    bad = os.path.join(folder, "bad.atf")
+    with open(bad, 'wb') as bad_file:
+        bad_file.write(b"&P000003 = X 3\n@tablet\n1. a\xff\n")
+    pool = worker_pool('oracc')
+    try:
+        assert check_and_process(bad, '', 'oracc', False, pool=pool) == -1
+        # The pool keeps serving the files after the failing one
+        assert check_and_process(os.path.join(folder, "bundle0.atf"), '',
+                                 'oracc', False, pool=pool) == 1
+    finally:
+        pool.close()
+        pool.join()
+
+
+def test_main_directory(tmpdir):
+    folder = write_bundles(tmpdir, 3)
+    result = CliRunner().invoke(main, ['-i', folder, '-f', 'oracc'])
+    assert result.exit_code == 0
+    assert result.output.count("Info: Correctly parsed") == 3
+    assert "Failed with 0 out of 3" in result.output
+
+
+def test_cached_segments(tmpdir):
+    path = os.path.join(str(tmpdir), "bundle.atf")
+    cache = ResultCache(os.path.join(str(tmpdir), "cache.sqlite"))
+    pool = worker_pool('oracc')
+    try:
+        def check(content):
+            with codecs.open(path, 'w', 'utf-8') as bundle_file:
+                bundle_file.write(content)
+            segments = Segmentor(path, False).segments()
+            return [(error[2], [e[1] for e in error[1]]) for error in
+                    check_cached_segments(pool, segments, path, 'oracc',
+                                          False, cache)]
+        assert check(broken) == [("P000003", [5])]
+        assert (cache.hits, cache.misses) == (0, 1)
+        # The cached error moves with the text
+        assert check(bundle + broken) == [("P000001", []),
+                                          ("P000002", []),
+                                          ("P000003", [15])]
+        assert (cache.hits, cache.misses) == (1, 3)
+    finally:
+        pool.close()
+        pool.join()
+        cache.close()
+
+
+def test_check_kind():
+    # Results are kept apart per ATF type, for whole files and for texts
+    # cut out of a bundle, and for each version of the lexer and grammar
+    assert len(set([check_kind('oracc'), check_kind('cdli'),
+                    check_kind('oracc', whole=True)])) == 3
+    assert grammar_signature('cdli') in check_kind('cdli')
+
+
+def test_manifest_since(tmpdir):
+    path = os.path.join(str(tmpdir), "bundle.atf")
+    first = os.path.join(str(tmpdir), "first.json")
+    second = os.path.join(str(tmpdir), "second.json")
+    with codecs.open(path, 'w', 'utf-8') as bundle_file:
+        bundle_file.write(broken + bundle)
+    result = CliRunner().invoke(main, ['-i', path, '-f', 'oracc',
+                                       '--manifest', first])
+    assert result.exit_code == 0
+    manifest = Manifest.load(first)
+    assert [(text['id'], text['line']) for text in manifest.texts] == [
+        ("P000003", 1), ("P000001", 7), ("P000002", 12)]
+    assert [e[1] for e in manifest.texts[0]['errors_yacc']] == [5]
+    # Only the changed text is checked again, the others keep their errors
+    with codecs.open(path, 'w', 'utf-8') as bundle_file:
+        bundle_file.write(broken + bundle.replace(u"a-na", u"a-na-ku"))
+    result = CliRunner().invoke(main, ['-i', path, '-f', 'oracc',
+                                       '--since', first,
+                                       '--manifest', second])
+    assert result.exit_code == 0
+    assert "2 texts reused from {0}, 1 checked".format(first) in result.output
+    assert Manifest.load(second).texts[0] == manifest.texts[0]
+
+
+def test_manifest_whole(tmpdir):
+    folder = write_bundles(tmpdir, 1)
+    result = CliRunner().invoke(main, ['-i', folder, '-f', 'oracc', '-w',
+                                       '--manifest',
+                                       os.path.join(folder, "m.json")])
+    assert result.exit_code != 0
+    assert "--whole" in result.output
+
+
+def separate_runner():
+    # Click 8.2 keeps stderr apart by default, and dropped mix_stderr
+    try:
+        return CliRunner(mix_stderr=False)
+    except TypeError:
+        return CliRunner()
+
+
+def test_format_jsonl(tmpdir):
+    path = os.path.join(str(tmpdir), "bundle.atf")
+    with codecs.open(path, 'w', 'utf-8') as bundle_file:
+        bundle_file.write(bundle + broken)
+    result = separate_runner().invoke(
+        main, ['-i', path, '-f', 'oracc', '--format', 'jsonl',
+               '-s', str(tmpdir)])
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert len(records) == 1
+    assert records[0]['atf_id'] == "P000003"
+    assert records[0]['path'] == path
+    assert records[0]['line'] == 15
+    assert records[0]['phase'] == "yacc"
+    assert set(records[0]) == set(['atf_id', 'path', 'line', 'offset',
+                                   'type', 'value', 'phase'])
+    assert "1 YACC error(s)" in result.stderr
+    with open(os.path.join(str(tmpdir), "PyOracc.jsonl")) as log:
+        assert [json.loads(line) for line in log] == records
+
+
+def test_jsonl_whole_summary(tmpdir, capsys):
+    # As with the text report, a summary folder is not used with --whole,
+    # and is not reported as a wrong path either
+    error_list = [([], [(u'a', 4, 9, 'ID')], "P000001", "b.atf", [])]
+    output_jsonl(error_list, str(tmpdir), True)
+    out, err = capsys.readouterr()
+    assert len(out.splitlines()) == 1
+    assert err == ""
+    assert not os.path.exists(os.path.join(str(tmpdir), "PyOracc.jsonl"))
+    output_jsonl(error_list, os.path.join(str(tmpdir), "missing"), False)
+    assert "missing" in capsys.readouterr()[1]
+
+
+def test_quiet(tmpdir):
+    path = os.path.join(str(tmpdir), "bundle.atf")
+    with codecs.open(path, 'w', 'utf-8') as bundle_file:
+        bundle_file.write(bundle + broken)
+    result = CliRunner().invoke(main, ['-i', path, '-f', 'oracc', '-q',
+                                       '-s', str(tmpdir)])
+    assert result.exit_code == 0
+    assert "YACC Error" not in result.output
+    assert "1 YACC error(s)" in result.output
+    # The log still has the whole report
+    with open(os.path.join(str(tmpdir), "PyOracc.log")) as log:
+        report = log.read()
+    assert "ATF_ID: P000003" in report
+    assert "YACC Error" in report
+
+
+def test_output_error_batches(tmpdir, capsys, monkeypatch):
+    monkeypatch.setattr(cli, 'REPORT_BUFFER_LINES', 2)
+    warning = CDLIWarning('surface-specific', "P000004", 'Prism',
+                          "Specific Surface type (ex. @obverse) are not "
+                          "allowed.")
+    error_list = [([(u'@', 3, 0)], [(u'a', 4, 9, 'ID')], "P000001", "b.atf",
+                   []),
+                  ([], [], "P000002", "b.atf", []),
+                  ([], [(u'b', 9, 2, 'ID')], "P000003", "b.atf", []),
+                  ([], [], "P000004", "b.atf", [warning])]
+    output_error(error_list, str(tmpdir), "b.atf", False, "summary")
+    lines = capsys.readouterr()[0].splitlines()
+    assert len(lines) == 8
+    assert lines[0].endswith("ATF_ID: P000001, Path: b.atf")
+    assert lines[3].startswith("[1] PyOracc Error: ATF_ID: P000003")
+    assert lines[5].startswith("[2] PyOracc Error: ATF_ID: P000004")
+    assert lines[6].strip().startswith("CDLI Warning: Specific Surface")
+    assert lines[7] == "summary"
+    with open(os.path.join(str(tmpdir), "PyOracc.log")) as log:
+        assert log.read().splitlines() == lines
+
+
+prism = u"""&P000002 = X 2
+@prism
+@obverse
+1. a
+"""
+
+
+def test_cdli_warnings(tmpdir):
+    path = os.path.join(str(tmpdir), "bundle.atf")
+    manifest = os.path.join(str(tmpdir), "manifest.json")
+    with codecs.open(path, 'w', 'utf-8') as bundle_file:
+        bundle_file.write(prism)
+    result = CliRunner().invoke(main, ['-i', path, '-f', 'cdli',
+                                       '--manifest', manifest])
+    assert result.exit_code == 0
+    assert "CDLI Warning: Specific Surface type" in result.output
+    assert "1 CDLI warning(s)" in result.output
+    assert "P000002: Prism Warning" not in result.output
+    # Texts reused from a manifest keep their warnings
+    result = CliRunner().invoke(main, ['-i', path, '-f', 'cdli',
+                                       '--since', manifest])
+    assert result.exit_code == 0
+    assert "1 texts reused" in result.output
+    assert "CDLI Warning: Specific Surface type" in result.output
+
+
+def test_cdli_warnings_jsonl(tmpdir):
+    path = os.path.join(str(tmpdir), "bundle.atf")
+    with codecs.open(path, 'w', 'utf-8') as bundle_file:
+        bundle_file.write(prism)
+    result = separate_runner().invoke(
+        main, ['-i', path, '-f', 'cdli', '--format', 'jsonl'])
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert records == [{'atf_id': "P000002", 'path': path,
+                        'phase': "warning", 'code': "surface-specific",
+                        'pnumber': "P000002", 'category': "Prism",
+                        'message': "Specific Surface type (ex. @obverse) "
+                                   "are not allowed."}]
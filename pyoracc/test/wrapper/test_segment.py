@@ -0,0 +1,94 @@
+'''
+Copyright 2015, 2016 University College London.
+
+This file is part of PyORACC.
+
+PyORACC is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyORACC is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyORACC. If not, see <http://www.gnu.org/licenses/>.
+'''
+
+
+import codecs
+import os
+
+from pyoracc.atf.common.atffile import check_atf_text
+from pyoracc.wrapper.segment import Segmentor, read_span
+
+bundle = u"""
+&P000001 = X 1
+@tablet
+@obverse
+1. a-na
+
+&P000002 = X 2
+@tablet
+@obverse
+1. a
+$ single ruling ruling
+"""
+
+
+def write_bundle(tmpdir):
+    path = os.path.join(str(tmpdir), "bundle.atf")
+    with codecs.open(path, 'w', 'utf-8') as bundle_file:
+        bundle_file.write(bundle)
+    return path
+
+
+def test_segments(tmpdir):
+    segments = list(Segmentor(write_bundle(tmpdir), False).segments())
+    assert [(atf_id, line) for atf_id, line, _ in segments] == \
+        [("P000001", 2), ("P000002", 7)]
+    assert segments[0][2].startswith(u"&P000001 = X 1\n@tablet")
+    # Nothing is written next to the bundle
+    parent = os.path.join(str(tmpdir), "..")
+    assert not [folder for folder in os.listdir(parent)
+                if folder.startswith("bundle.atfsegment")]
+
+
+def test_segment_error_lines(tmpdir):
+    atf_id, start_line, text = \
+        list(Segmentor(write_bundle(tmpdir), False).segments())[1]
+    errors_lex, errors_yacc, _ = check_atf_text(text, 'oracc', skip=True,
+                                                lineno=start_line)
+    assert errors_lex == []
+    # The error is reported on the line of the bundle, not of the text
+    assert [error[1] for error in errors_yacc] == [11]
+
+
+def test_spans(tmpdir):
+    path = write_bundle(tmpdir)
+    segmentor = Segmentor(path, False)
+    spans = list(segmentor.spans())
+    assert [(atf_id, line) for atf_id, line, _, _ in spans] == \
+        [("P000001", 2), ("P000002", 7)]
+    assert [read_span(path, offset, length)
+            for _, _, offset, length in spans] == \
+        [text for _, _, text in segmentor.segments()]
+
+
+def test_spans_line_breaks(tmpdir):
+    path = os.path.join(str(tmpdir), "bundle.atf")
+    with open(path, 'wb') as bundle_file:
+        bundle_file.write(b"\r\n &P000001 = X 1\r\n1. a\r"
+                          b"&P000002\xe2\x80\xa8\xc2\xa0&P000003 = X 3\n")
+    assert list(Segmentor(path, False).segments()) == [
+        ("P000001", 2, u"&P000001 = X 1\n1. a"),
+        ("P000002", 4, u"&P000002"),
+        ("P000003", 5, u"&P000003 = X 3")]
+
+
+def test_spans_empty(tmpdir):
+    path = os.path.join(str(tmpdir), "empty.atf")
+    open(path, 'wb').close()
+    assert list(Segmentor(path, False).spans()) == []
@@ -9,8 +9,10 @@ class LogTemplate(object):
         self.head_tmp_default= u"[{}] PyOracc Error: ATF_ID: {}, Path: {}"
         self.yacc_tmp_default= u"YACC Error: can't parse tocken '{}', (line {}, offset {}, tokenType {}) "
         self.lex_tmp_default= u"LEX Error: can't identify char '{}', (line {}, offset {}) "
+        self.warning_tmp_default= u"CDLI Warning: {} (pnumber {}, category {}, code {}) "
         self.wrong_logpath_tmp= u"PyOracc Error: Wrong path to place the log file. {} "
         self.summary_num_tmp= u"PyOracc Summary: {} LEX error(s), {} YACC error(s) in {}."
+        self.summary_warnings_tmp= u"PyOracc Summary: {} LEX error(s), {} YACC error(s), {} CDLI warning(s) in {}."
         self.summary_end_tmp= u"PyOracc Info: Finished parsing {0}."
         self.raise_tmp= u"PyOracc failed with message: {0} in {1}"
 
@@ -31,13 +33,23 @@ class LogTemplate(object):
         mesg = mesg.encode('UTF-8') if _pyversion()==2 else mesg
         return mesg
 
+    def warning_default(self,message,pnumber,category,code):
+        mesg = self.warning_tmp_default.format(message,pnumber,category,code)
+        mesg = mesg.encode('UTF-8') if _pyversion()==2 else mesg
+        return mesg
     def wrong_path(self,log_path):
         mesg = self.wrong_logpath_tmp.format(log_path)
         mesg = mesg.encode('UTF-8') if _pyversion()==2 else mesg
         return mesg
 
-    def summary_num(self,lex_num,yacc_num,pathname):
-        mesg = self.summary_num_tmp.format(lex_num,yacc_num,pathname)
+    def summary_num(self,lex_num,yacc_num,pathname,warning_num=0):
+        # Warnings are only counted where there are any, so the summary
+        # of a run without CDLI checks stays as it was
+        if warning_num:
+            mesg = self.summary_warnings_tmp.format(lex_num,yacc_num,
+                                                    warning_num,pathname)
+        else:
+            mesg = self.summary_num_tmp.format(lex_num,yacc_num,pathname)
         mesg = mesg.encode('UTF-8') if _pyversion()==2 else mesg
         return mesg
 
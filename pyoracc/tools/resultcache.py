@@ -0,0 +1,79 @@
+"""
+On disk cache of parse results, so that texts which have not changed since
+an earlier run are not lexed and parsed again.
+"""
+import hashlib
+import sqlite3
+
+from pyoracc import __version__, _pyversion
+
+if _pyversion() == 2:
+    import cPickle as pickle
+else:
+    import pickle
+
+
+class ResultCache(object):
+    """
+    Results stored in a SQLite database file, keyed by the SHA-256 of the
+    text together with the ATF type, the kind of result and the pyoracc
+    version, so that a new release never reuses results of an older one.
+    Values are pickled, so only open caches you trust. A cache is meant to
+    be used from a single thread of a single process at a time.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS results "
+                                "(key TEXT PRIMARY KEY, value BLOB)")
+
+    @staticmethod
+    def key(content, atftype, kind):
+        """
+        Key for the result of kind (e.g. "check") for content, which is
+        either unicode text or the raw bytes of a file.
+        """
+        if not isinstance(content, bytes):
+            content = content.encode('utf-8')
+        digest = hashlib.sha256()
+        for part in (__version__, atftype, kind):
+            digest.update(part.encode('utf-8') + b'\0')
+        digest.update(content)
+        return digest.hexdigest()
+
+    def __contains__(self, key):
+        return self.connection.execute(
+            "SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
+
+    def get(self, key):
+        """
+        Return the value stored for key, or None.
+        """
+        row = self.connection.execute(
+            "SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(bytes(row[0]))
+
+    def put(self, key, value):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+            (key, sqlite3.Binary(pickle.dumps(value, 2))))
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
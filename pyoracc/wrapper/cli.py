@@ -1,102 +1,309 @@
 import os
+import json
 import time
 import codecs
 import click
+from itertools import islice
 from multiprocessing import Pool
 from stat import ST_MODE, S_ISREG
 
-from pyoracc.wrapper.segment import Segmentor
+from pyoracc.wrapper.manifest import Manifest
+from pyoracc.wrapper.segment import Segmentor, read_span
 
-from pyoracc.atf.common.atffile import check_atf
+from pyoracc.atf.common.atffile import (check_atf, check_atf_text,
+                                        get_lexer_parser, grammar_signature)
 from pyoracc.tools.logtemplate import LogTemplate
+from pyoracc.tools.resultcache import ResultCache
 log_tmp=LogTemplate()
 
-def output_error(error_list, summary, pathname, whole, summary_str):
+# Number of texts handed to a worker at a time when checking a bundle
+SEGMENT_CHUNKSIZE = 32
+# Number of texts looked up in the result cache at a time, before those
+# which were not found are handed to the workers
+CACHE_BATCHSIZE = 1024
+# Number of lines of an error report written out at a time
+REPORT_BUFFER_LINES = 8192
+# Version of the results kept in the cache and the manifest. The lexer
+# rules and grammar are part of their key already; bump this whenever the
+# checks or the form of their results change.
+CHECK_VERSION = 2
+
+
+def check_kind(atftype, whole=False):
+    """
+    Return the kind under which the errors and warnings found in a text of
+    atftype are kept: one cut out of a bundle, or with whole a whole file.
+    """
+    return '{0}-{1}-{2}'.format('check-whole' if whole else 'check',
+                                CHECK_VERSION, grammar_signature(atftype))
+
+
+def report_lines(error_list):
+    """
+    Yield the lines of the text report of the errors and warnings in
+    error_list.
+    """
+    error_idx = 0
+    for error in error_list:
+        if (len(error[0]) + len(error[1]) + len(error[4])) > 0:
+            yield log_tmp.head_default(error_idx, error[2], error[3])
+            error_idx += 1
+        for lex_err in error[0]:
+            yield " "*6 + log_tmp.lex_default(lex_err[0], lex_err[1],
+                                              lex_err[2])
+        for yacc_err in error[1]:
+            yield " "*6 + log_tmp.yacc_default(yacc_err[0], yacc_err[1],
+                                               yacc_err[2], yacc_err[3])
+        for warning in error[4]:
+            yield " "*6 + log_tmp.warning_default(warning.message,
+                                                  warning.pnumber,
+                                                  warning.category,
+                                                  warning.code)
+
+
+def output_error(error_list, summary, pathname, whole, summary_str,
+                 quiet=False):
+    # The report is written REPORT_BUFFER_LINES lines at a time, rather than
+    # echoing and flushing every line; quiet leaves it out of the output
+    # but not out of the log
+    log_file = None
     if len(summary) > 0 and os.path.isdir(summary) and (not whole):
         summary = summary if summary[-1]=='/' else summary+'/'
-        file = open(summary+"PyOracc.log", "a+")
-        error_idx=0
-        for error in error_list:
-            if ( len(error[0]) + len(error[1]) ) > 0:
-                head_str = log_tmp.head_default(error_idx,error[2],error[3])
-                click.echo(head_str)
-                file.write(head_str + '\n')
-                error_idx+=1
-            for lex_err in error[0]:
-                lex_str = (" "*6 + log_tmp.lex_default(lex_err[0],lex_err[1],lex_err[2]))#.encode('utf-8')
-                click.echo(lex_str)
-                file.write(lex_str + '\n')
-            for yacc_err in error[1]:
-                yacc_str = (" "*6 + log_tmp.yacc_default(yacc_err[0],yacc_err[1],yacc_err[2],yacc_err[3]))#.encode('utf-8')
-                click.echo(yacc_str)
-                file.write(yacc_str + '\n')
-        file.write(summary_str + '\n')
-        file.close()
-    else:
-        error_idx=0
-        for error in error_list:
-            if ( len(error[0]) + len(error[1]) ) > 0:
-                head_str = log_tmp.head_default(error_idx,error[2],error[3])
-                click.echo(head_str)
-                error_idx+=1
-            for lex_err in error[0]:
-                lex_str = " "*6 + log_tmp.lex_default(lex_err[0],lex_err[1],lex_err[2])
-                click.echo(lex_str)
-            for yacc_err in error[1]:
-                yacc_str = " "*6 + log_tmp.yacc_default(yacc_err[0],yacc_err[1],yacc_err[2],yacc_err[3])
-                click.echo(yacc_str)
-        if not os.path.isdir(summary) and (not whole):
+        log_file = open(summary+"PyOracc.log", "a+")
+    try:
+        lines = report_lines(error_list)
+        batch = list(islice(lines, REPORT_BUFFER_LINES))
+        while batch:
+            report = '\n'.join(batch) + '\n'
+            if not quiet:
+                click.echo(report, nl=False)
+            if log_file is not None:
+                log_file.write(report)
+            batch = list(islice(lines, REPORT_BUFFER_LINES))
+        if log_file is not None:
+            log_file.write(summary_str + '\n')
+        elif not os.path.isdir(summary) and (not whole):
             click.echo(log_tmp.wrong_path(summary))
+    finally:
+        if log_file is not None:
+            log_file.close()
     click.echo(summary_str)
 
 
-def check_atf_message((segpathname, atftype, verbose,skip)): # this tuple parameters format no longer support in python3
-    # click.echo('\n Info: Parsing {0}.'.format(segpathname))
-    errors_lex,errors_yacc = check_atf(segpathname, atftype, verbose,skip)
+def error_records(error_list):
+    """
+    Yield a dict for every error and warning in error_list, in the form
+    written by --format jsonl. type is the token type of a YACC error, None
+    for LEX. Warnings have no line or offset, and their own fields instead.
+    """
+    for errors_lex, errors_yacc, atf_id, pathname, warnings in error_list:
+        for value, line, offset in errors_lex:
+            yield {'atf_id': atf_id, 'path': pathname, 'line': line,
+                   'offset': offset, 'type': None, 'value': value,
+                   'phase': 'lex'}
+        for value, line, offset, token_type in errors_yacc:
+            yield {'atf_id': atf_id, 'path': pathname, 'line': line,
+                   'offset': offset, 'type': token_type, 'value': value,
+                   'phase': 'yacc'}
+        for warning in warnings:
+            record = warning._asdict()
+            record.update({'atf_id': atf_id, 'path': pathname,
+                           'phase': 'warning'})
+            yield record
+
+
+def output_jsonl(error_list, summary, whole, quiet=False):
+    # All the errors of a file are written at once, to standard output and,
+    # like the text log, to the summary folder if there is one
+    lines = ''.join(json.dumps(record, sort_keys=True) + '\n'
+                    for record in error_records(error_list))
+    if not quiet:
+        click.echo(lines, nl=False)
+    if len(summary) > 0 and os.path.isdir(summary) and (not whole):
+        with open(os.path.join(summary, "PyOracc.jsonl"), "a") as log:
+            log.write(lines)
+    elif len(summary) > 0 and not os.path.isdir(summary) and (not whole):
+        click.echo(log_tmp.wrong_path(summary), err=True)
+
+
+def check_atf_message(args):
+    # Takes one tuple of arguments, as Pool.map hands them over
+    segpathname, atftype, verbose, skip = args
+    errors_lex,errors_yacc,warnings = check_atf(segpathname, atftype,
+                                                verbose,skip)
     atf_id = (segpathname.split('/')[-1]).split('.')[0] # extract atf_id(e.g. P136211) 
-    return (errors_lex,errors_yacc,atf_id,segpathname)
+    return (errors_lex,errors_yacc,atf_id,segpathname,warnings)
+
+
+def check_atf_segment(args):
+    atf_id, start_line, text, pathname, atftype, verbose, skip = args
+    errors_lex, errors_yacc, warnings = check_atf_text(text, atftype,
+                                                       verbose, skip,
+                                                       start_line)
+    return (errors_lex, errors_yacc, atf_id, pathname, warnings)
+
+
+def check_atf_span(args):
+    # The worker reads and decodes its own text from the bundle
+    atf_id, start_line, offset, length, pathname, atftype, verbose, skip = args
+    return check_atf_segment((atf_id, start_line,
+                              read_span(pathname, offset, length),
+                              pathname, atftype, verbose, skip))
+
+
+def init_worker(atftype):
+    # Build the worker's lexer and parser once, before any text arrives;
+    # every later text in this process reuses them
+    get_lexer_parser(atftype, skip=True)
 
 
-def check_and_process(pathname,summary,atftype, whole, verbose=False):
+def worker_pool(atftype):
+    return Pool(initializer=init_worker, initargs=(atftype,))
+
+
+def feed(tasks, failures):
+    # Pool.imap pulls tasks from a helper thread, where Python 2 drops any
+    # exception raised while reading the bundle; keep it for the caller
+    try:
+        for task in tasks:
+            yield task
+    except Exception as e:
+        failures.append(e)
+
+
+def shift_lines(errors, offset):
+    # Errors are (value, line, ...) tuples
+    return [(error[0], error[1] + offset) + tuple(error[2:])
+            for error in errors]
+
+
+def check_cached_segments(pool, segments, pathname, atftype, verbose, cache,
+                          manifest=None):
+    """
+    Check the (atf_id, start_line, text) segments on pool like
+    check_atf_segment, except that texts found in cache are not checked
+    again. The cache keeps line numbers relative to the start of the text,
+    so a text is still found after moving within its bundle. Every text is
+    also added to manifest, if given; cache may then be None.
+    """
+    kind = check_kind(atftype)
+    batch = list(islice(segments, CACHE_BATCHSIZE))
+    while batch:
+        keys = [ResultCache.key(text, atftype, kind)
+                for _, _, text in batch]
+        if cache is not None:
+            relative = [cache.get(key) for key in keys]
+        else:
+            relative = [None] * len(keys)
+        misses = [index for index, result in enumerate(relative)
+                  if result is None]
+        tasks = [batch[index] + (pathname, atftype, verbose, True)
+                 for index in misses]
+        checked = pool.imap(check_atf_segment, tasks, SEGMENT_CHUNKSIZE)
+        for index, result in zip(misses, checked):
+            start_line = batch[index][1]
+            relative[index] = (shift_lines(result[0], 1 - start_line),
+                               shift_lines(result[1], 1 - start_line),
+                               result[4])
+            if cache is not None:
+                cache.put(keys[index], relative[index])
+        if cache is not None:
+            cache.commit()
+        for (atf_id, start_line, _), key, (errors_lex, errors_yacc,
+                                           warnings) in zip(batch, keys,
+                                                            relative):
+            if manifest is not None:
+                manifest.add(pathname, atf_id, start_line, key,
+                             errors_lex, errors_yacc, warnings)
+            yield (shift_lines(errors_lex, start_line - 1),
+                   shift_lines(errors_yacc, start_line - 1),
+                   atf_id, pathname, warnings)
+        batch = list(islice(segments, CACHE_BATCHSIZE))
+
+
+def check_cached_file(pathname, atftype, verbose, cache):
+    with open(pathname, 'rb') as atf:
+        key = cache.key(atf.read(), atftype,
+                        check_kind(atftype, whole=True))
+    result = cache.get(key)
+    if result is None:
+        result = check_atf_message((pathname, atftype, verbose, False))
+        cache.put(key, (result[0], result[1], result[4]))
+        cache.commit()
+        return result
+    errors_lex, errors_yacc, warnings = result
+    atf_id = (pathname.split('/')[-1]).split('.')[0]
+    return (errors_lex, errors_yacc, atf_id, pathname, warnings)
+
+
+def check_and_process(pathname,summary,atftype, whole, verbose=False,
+                      pool=None, cache=None, manifest=None,
+                      output_format='text', quiet=False):
+    # With JSON Lines on standard output, everything else goes to stderr
+    err = output_format == 'jsonl'
+
     mode = os.stat(pathname)[ST_MODE]
     error_list = None
     if S_ISREG(mode) and pathname.lower().endswith('.atf'):
         # It's a file, call the callback function
         if verbose:
-            click.echo('Info: Parsing {0}.'.format(pathname))
+            click.echo('Info: Parsing {0}.'.format(pathname), err=err)
         try:
             if not whole:
-                pool = Pool()
-                segmentor = Segmentor(pathname, verbose)
-                outfolder = segmentor.convert()
-                if verbose:
-                    click.echo('Info: Segmented into {0}.'.format(outfolder))
-
-                files = map(lambda f: os.path.join(outfolder, f), os.listdir(outfolder))
-                count_files = len(files)
-                atftypelist = [atftype]*count_files
-                verboselist = [verbose]*count_files
-                skiplist = [not whole]*count_files
-                error_list = pool.map(check_atf_message, zip(files, atftypelist, verboselist,skiplist)) # get error list
-                pool.close()
+                # A pool handed in by the caller is shared with other files
+                # and left running; otherwise one is started for this file
+                own_pool = pool is None
+                if own_pool:
+                    pool = worker_pool(atftype)
+                try:
+                    segmentor = Segmentor(pathname, verbose)
+                    if cache is not None or manifest is not None:
+                        error_list = list(check_cached_segments(
+                            pool, segmentor.segments(), pathname, atftype,
+                            verbose, cache, manifest))
+                    else:
+                        # Only where each text lies in the bundle is sent
+                        # to the workers, which read the text themselves
+                        tasks = (span + (pathname, atftype, verbose,
+                                         not whole)
+                                 for span in segmentor.spans())
+                        failures = []
+                        error_list = list(pool.imap(check_atf_span,
+                                                    feed(tasks, failures),
+                                                    SEGMENT_CHUNKSIZE))
+                        if failures:
+                            raise failures[0]
+                finally:
+                    if own_pool:
+                        pool.close()
+                        pool.join()
+            elif cache is not None:
+                error_list = [check_cached_file(pathname, atftype, verbose,
+                                                cache)]
             else:
                 error_list = [check_atf_message((pathname, atftype, verbose,(not whole)))] # get error list
-            # error_list: [(lex_errors:list, yacc_errors:list, atf_id, segpathname)......]
+            # error_list: [(lex_errors:list, yacc_errors:list, atf_id, segpathname, warnings:list)......]
             # summarize the work
-            lex_error_num, yacc_error_num = 0, 0
+            lex_error_num, yacc_error_num, warning_num = 0, 0, 0
             for error in error_list:
                 lex_error_num += len(error[0])
                 yacc_error_num += len(error[1])
-            summary_str=log_tmp.summary_num(lex_error_num,yacc_error_num,pathname)
-            if (lex_error_num + yacc_error_num) == 0:
+                warning_num += len(error[4])
+            summary_str=log_tmp.summary_num(lex_error_num,yacc_error_num,
+                                            pathname,warning_num)
+            if err:
+                output_jsonl(error_list, summary, whole, quiet)
+                click.echo(summary_str, err=True)
+            elif (lex_error_num + yacc_error_num + warning_num) == 0:
                 click.echo(summary_str)
             else:
-                output_error(error_list,summary,pathname,whole,summary_str)
-            click.echo(log_tmp.summary_end(pathname))
+                output_error(error_list, summary, pathname, whole,
+                             summary_str, quiet)
+            click.echo(log_tmp.summary_end(pathname), err=err)
             return 1
         except (SyntaxError, IndexError, AttributeError,
                 UnicodeDecodeError) as e:
-            click.echo(log_tmp.raise_error(e, pathname))
+            click.echo(log_tmp.raise_error(e, pathname), err=err)
             return -1
 
 
@@ -114,33 +321,84 @@ def check_and_process(pathname,summary,atftype, whole, verbose=False):
               help='Enables verbose mode.')
 @click.option('--summary', '-s', type=click.STRING,default='', required=False,
                 help='Folder path for log and summary of parser, only useful when run file without -w/--whole')
+@click.option('--cache', '-c', type=click.Path(dir_okay=False), default=None,
+              required=False,
+              help='File in which to keep the results between runs, so that texts which have not changed are not checked again.')
+@click.option('--since', type=click.Path(exists=True, dir_okay=False),
+              default=None, required=False,
+              help='Manifest written by an earlier run with --manifest; only texts added or changed since then are checked.')
+@click.option('--manifest', type=click.Path(dir_okay=False), default=None,
+              required=False,
+              help='File to which to write the manifest of this run, for use with --since next time.')
+@click.option('--format', 'output_format', type=click.Choice(['text', 'jsonl']),
+              default='text', required=False,
+              help='Write the errors as text, or as one JSON object per line with the other messages on stderr.')
+@click.option('--quiet', '-q', default=False, required=False, is_flag=True,
+              help='Only print the summary of the errors; the log still lists them all.')
 @click.version_option()
-def main(input_path, atf_type, whole, verbose,summary):
+def main(input_path, atf_type, whole, verbose,summary, cache, since,
+         manifest, output_format, quiet):
     """My Tool does one work, and one work well."""
     tsbegin = time.time()
+    err = output_format == 'jsonl'
+    if whole and (since is not None or manifest is not None):
+        raise click.UsageError('--since and --manifest need the texts to be '
+                               'segmented, leave out -w/--whole.')
+    if since is not None and cache is not None:
+        raise click.UsageError('Use either --since or -c/--cache.')
+    manifest_path = manifest
+    if manifest is not None:
+        manifest = Manifest(atf_type)
+    if since is not None:
+        cache = Manifest.load(since)
+    elif cache is not None:
+        cache = ResultCache(cache)
     if os.path.isdir(input_path):
         failures = 0
         successes = 0
-        with click.progressbar(os.listdir(input_path),
-                               label='Info: Checking the files') as bar:
-            for index, f in enumerate(bar):
-                pathname = os.path.join(input_path, f)
-                try:
-                    check_and_process(pathname, summary, atf_type, whole, verbose)
-                    successes += 1
-                    click.echo('Info: Correctly parsed {0}.'.format(pathname))
-                except (SyntaxError, IndexError, AttributeError,
-                        UnicodeDecodeError) as e:
-                    failures += 1
-                    click.echo("Info: Failed with message: {0} in {1}"
-                               .format(e, pathname))
-                finally:
+        # One pool serves every file in the directory, so the workers are
+        # started and their lexer and parser built once per run
+        pool = None if whole else worker_pool(atf_type)
+        try:
+            with click.progressbar(os.listdir(input_path),
+                                   label='Info: Checking the files',
+                                   file=click.get_text_stream(
+                                       'stderr' if err else 'stdout')) as bar:
+                for index, f in enumerate(bar):
+                    pathname = os.path.join(input_path, f)
                     try:
-                        click.echo("Failed with {0} out of {1} ({2}%)"
-                                   .format(failures, failures + successes, failures * 100.0 / (failures + successes)))
-                    except ZeroDivisionError:
-                        click.echo("Empty files to process")
+                        check_and_process(pathname, summary, atf_type, whole,
+                                          verbose, pool, cache, manifest,
+                                          output_format, quiet)
+                        successes += 1
+                        click.echo('Info: Correctly parsed {0}.'.format(pathname),
+                                   err=err)
+                    except (SyntaxError, IndexError, AttributeError,
+                            UnicodeDecodeError) as e:
+                        failures += 1
+                        click.echo("Info: Failed with message: {0} in {1}"
+                                   .format(e, pathname), err=err)
+                    finally:
+                        try:
+                            click.echo("Failed with {0} out of {1} ({2}%)"
+                                       .format(failures, failures + successes, failures * 100.0 / (failures + successes)),
+                                       err=err)
+                        except ZeroDivisionError:
+                            click.echo("Empty files to process", err=err)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
     else:
-        check_and_process(input_path, summary, atf_type, whole, verbose)
+        check_and_process(input_path, summary, atf_type, whole, verbose,
+                          cache=cache, manifest=manifest,
+                          output_format=output_format, quiet=quiet)
+    if manifest is not None:
+        manifest.save(manifest_path)
+    if cache is not None:
+        click.echo("Info: {0} texts reused from {1}, {2} checked."
+                   .format(cache.hits, cache.path, cache.misses), err=err)
+        cache.close()
     tsend = time.time()
-    click.echo("Total time taken: {0} minutes".format((tsend-tsbegin)/60.0))
+    click.echo("Total time taken: {0} minutes".format((tsend-tsbegin)/60.0),
+               err=err)
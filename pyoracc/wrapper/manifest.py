@@ -0,0 +1,69 @@
+import json
+
+from pyoracc.cdlimodel.cdliwarning import CDLIWarning
+from pyoracc.tools.resultcache import ResultCache
+
+
+class Manifest(object):
+    """
+    Every text checked in a run, in order: the bundle it came from, its id,
+    the line it starts on, the hash of its content and the errors and
+    warnings found in it, with line numbers relative to the start of the
+    text. A manifest from an earlier run answers lookups the way a
+    ResultCache does, so only the texts which were added or changed since
+    have to be checked.
+    """
+
+    def __init__(self, atftype, texts=(), path=None):
+        self.atftype = atftype
+        self.path = path
+        self.texts = list(texts)
+        self.results = {}
+        for text in self.texts:
+            self.results[text['sha256']] = (
+                [tuple(error) for error in text['errors_lex']],
+                [tuple(error) for error in text['errors_yacc']],
+                [CDLIWarning(*warning)
+                 for warning in text.get('warnings', ())])
+        self.hits = 0
+        self.misses = 0
+
+    key = staticmethod(ResultCache.key)
+
+    def __contains__(self, key):
+        return key in self.results
+
+    def get(self, key):
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key, value):
+        self.results[key] = value
+
+    def commit(self):
+        pass
+
+    def add(self, path, atf_id, line, key, errors_lex, errors_yacc,
+            warnings):
+        self.texts.append({'path': path, 'id': atf_id, 'line': line,
+                           'sha256': key, 'errors_lex': errors_lex,
+                           'errors_yacc': errors_yacc,
+                           'warnings': list(warnings)})
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as manifest_file:
+            manifest = json.load(manifest_file)
+        return cls(manifest['atftype'], manifest['texts'], path)
+
+    def save(self, path):
+        with open(path, 'w') as manifest_file:
+            json.dump({'atftype': self.atftype, 'texts': self.texts},
+                      manifest_file, indent=1)
+
+    def close(self):
+        pass
@@ -1,13 +1,24 @@
 import codecs
 import click
+import mmap
 import os
+import re
 import sys
 import time
+from contextlib import contextmanager
 
 
 ts = time.time()
 OUTPUT_FOLDER = 'segment'+str(ts)
 
+# The line breaks of unicode.splitlines, which codecs uses to read lines,
+# as they are encoded in UTF-8
+LINE_BREAK = re.compile(b'\r\n|\n|\r|\x0b|\x0c|\x1c|\x1d|\x1e|'
+                        b'\xc2\x85|\xe2\x80\xa8|\xe2\x80\xa9')
+# Those of them which are neither "\n" nor "\r" and so rarely turn up
+RARE_BREAKS = (b'\x0b', b'\x0c', b'\x1c', b'\x1d', b'\x1e',
+               b'\xc2\x85', b'\xe2\x80\xa8', b'\xe2\x80\xa9')
+
 
 class Segmentor:
     def __init__(self, inputFile, verbose):
@@ -22,14 +33,34 @@ class Segmentor:
         self.lines = []
 
     def convert(self):
-        if self.verbose:
-            click.echo('Info: Reading file {0}.'.format(self.inputFileName))
-        with codecs.open(self.inputFileName, 'r', 'utf-8') as openedFile:
-            for (i, line) in enumerate(openedFile):
-                self.__parse(i, line.strip())
-        self.write2file()
+        for atf_id, _, text in self.segments():
+            self.outputFilename = atf_id
+            self.lines = [text]
+            self.write2file()
         return self.outfolder
 
+    def segments(self):
+        """
+        Yield an (atf_id, start_line, text) tuple for every text in the
+        input file without writing anything to disk. start_line is the line
+        of the input file on which the text starts, counting from 1.
+        """
+        with mapped(self.inputFileName, self.verbose) as bundle:
+            for atf_id, start_line, offset, length in find_spans(bundle):
+                yield (atf_id, start_line,
+                       normalize(bundle[offset:offset + length]))
+
+    def spans(self):
+        """
+        Yield an (atf_id, start_line, offset, length) tuple for every text
+        in the input file, where offset and length give the bytes of the
+        text, to be read with read_span. Only the lines starting a text are
+        decoded, so the bundle is never held in memory as a whole.
+        """
+        with mapped(self.inputFileName, self.verbose) as bundle:
+            for span in find_spans(bundle):
+                yield span
+
     def write2file(self):
         if not os.path.exists(self.outfolder):
             click.echo(
@@ -42,17 +73,119 @@ class Segmentor:
         with codecs.open(outfile_name, 'w+', 'utf-8') as outputFile:
             outputFile.writelines('\n'.join(self.lines))
 
-    def __parse(self, linenumber, line):
-        tokenizedLine = line.split(" ")
-        if len(line) == 0:
-            pass
-        elif line[0] == "&":
-            if len(self.lines) > 0:
-                self.write2file()
-            self.__reset__()
-            firstword = tokenizedLine[0].lstrip("&")
-            self.outputFilename = firstword
-        self.lines.append(line)
+
+@contextmanager
+def mapped(path, verbose=False):
+    """
+    Map the file at path into memory for reading, as a bytes-like object.
+    """
+    if verbose:
+        click.echo('Info: Reading file {0}.'.format(path))
+    with open(path, 'rb') as atf:
+        if os.fstat(atf.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            yield b''
+            return
+        bundle = mmap.mmap(atf.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield bundle
+        finally:
+            bundle.close()
+
+
+def first_line(bundle, start):
+    """
+    Return the line of bundle starting at offset start, decoded and with
+    the white space around it removed.
+    """
+    end = LINE_BREAK.search(bundle, start)
+    end = len(bundle) if end is None else end.start()
+    return bundle[start:end].decode('utf-8').strip()
+
+
+def count_lines(data):
+    """
+    Return the number of line breaks in data, UTF-8 bytes.
+    """
+    if any(rare in data for rare in RARE_BREAKS):
+        return len(LINE_BREAK.findall(data))
+    return data.count(b'\n') + data.count(b'\r') - data.count(b'\r\n')
+
+
+def line_start(bundle, pos):
+    """
+    Return the offset of the line of bundle holding pos when only white
+    space comes before pos on that line, and None otherwise.
+    """
+    start = pos
+    while start > 0 and bundle[start - 1:start] in (b' ', b'\t'):
+        start -= 1
+    before = bundle[start - 1:start]
+    if not before or before in (b'\n', b'\r', b'\x0b', b'\x0c',
+                                b'\x1c', b'\x1d', b'\x1e'):
+        return start
+    if before < b'\x80' and before != b'\x1f':
+        return None
+    # Other white space, or a line break, of more than one byte: decode
+    # ever more of what comes before until the start of the line is found
+    window = 64
+    while True:
+        begin = max(0, pos - window)
+        # Skip the rest of a character cut in half by the window
+        while b'\x80' <= bundle[begin:begin + 1] < b'\xc0':
+            begin += 1
+        # An "x" makes sure the line holding pos is the last one split off
+        lines = (bundle[begin:pos].decode('utf-8') + u'x').splitlines()
+        line = lines[-1][:-1]
+        if line.strip():
+            return None
+        if begin == 0 or len(lines) > 1:
+            return pos - len(line.encode('utf-8'))
+        window *= 2
+
+
+def find_spans(bundle):
+    """
+    Yield (atf_id, start_line, offset, length) for every text in bundle,
+    the UTF-8 bytes of an ATF file. A text starts on each line beginning
+    with "&"; anything but white space before the first such line makes
+    up a text without an id.
+    """
+    atf_id = ''
+    start_line = 1
+    start = 0
+    found = bundle.find(b'&')
+    while found != -1:
+        text_start = line_start(bundle, found)
+        if text_start is not None:
+            data = bundle[start:text_start]
+            if atf_id or data.decode('utf-8').strip():
+                yield atf_id, start_line, start, text_start - start
+            start_line += count_lines(data)
+            start = text_start
+            atf_id = first_line(bundle, found).split(" ")[0].lstrip("&")
+        found = bundle.find(b'&', found + 1)
+    if atf_id or bundle[start:].decode('utf-8').strip():
+        yield atf_id, start_line, start, len(bundle) - start
+
+
+def normalize(data):
+    """
+    Decode data, the bytes of a text, and remove the white space around
+    each of its lines.
+    """
+    return u'\n'.join(line.strip()
+                      for line in data.decode('utf-8').splitlines())
+
+
+def read_span(path, offset, length):
+    """
+    Return the text of path found at offset by Segmentor.spans, the same
+    as Segmentor.segments gives it.
+    """
+    with open(path, 'rb') as atf:
+        atf.seek(offset)
+        return normalize(atf.read(length))
 
 
 if __name__ == '__main__':
@@ -23,6 +23,7 @@ from setuptools.command.build_py import build_py
 # To use a consistent encoding
 from codecs import open
 from os import path
+import re
 import sys
 
 here = path.abspath(path.dirname(__file__))
@@ -31,12 +32,16 @@ here = path.abspath(path.dirname(__file__))
 with open(path.join(here, 'README.md'), encoding='utf-8') as f:
     long_description = f.read()
 
+# Get the version from the package, without importing it and its
+# dependencies
+with open(path.join(here, 'pyoracc', '__init__.py'), encoding='utf-8') as f:
+    version = re.search(r"^__version__ = '(.*)'", f.read(), re.M).group(1)
+
 
 
 dependencies = ['click', 'mako', 'ply', 'multiprocessing'] 
 if sys.version_info.major==3:
     dependencies = ['click', 'mako', 'ply'] # mutiprocessing is a internal tool in python3, installation will cause error
-    sys.exit("Sorry, Python 3 is not supported (yet)")
 
 
 extra_dependencies = ['pytest', 'pytest-cov', 'codecov', 'pycodestyle']
@@ -57,7 +62,7 @@ class MyBuildPy(build_py):
 
 
 setup(name='pyoracc',
-      version='0.2.4',
+      version=version,
       author='UCL Research IT Services',
       author_email='rc-softdev@ucl.ac.uk',
       description='Python tools for working with ORACC/CDLI ATF files',
@@ -100,7 +105,12 @@ setup(name='pyoracc',
           'Operating System :: Microsoft :: Windows',
           'Programming Language :: Python',
           'Programming Language :: Python :: 2',
+          'Programming Language :: Python :: 2.7',
           'Programming Language :: Python :: 3',
+          'Programming Language :: Python :: 3.5',
+          'Programming Language :: Python :: 3.6',
+          'Programming Language :: Python :: 3.7',
+          'Programming Language :: Python :: 3.8',
           'Topic :: Software Development :: Libraries :: Python Modules',
           'Topic :: Utilities'
       ],